@@ -0,0 +1,164 @@
+import asyncio
+import time
+from contextlib import AsyncExitStack
+from urllib.parse import urlsplit
+
+import aiohttp
+
+import price_cache
+import timing
+from http_fetch import HEADERS, NeedsBrowser
+
+# =========================
+# CONFIG
+# =========================
+
+PER_HOST = 4        # requests in flight per host
+RATE = 4.0          # requests per second per host
+BURST = 4
+TIMEOUT = 20        # seconds per request
+
+# =========================
+# RATE LIMITING
+# =========================
+
+class TokenBucket:
+    """rate tokens per second, up to burst stored; acquire() waits for one"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class HostLimiter:
+    """K requests in flight and a token bucket for every host"""
+
+    def __init__(self, per_host=PER_HOST, rate=RATE, burst=BURST):
+        self.per_host = per_host
+        self.rate = rate
+        self.burst = burst
+        self._slots = {}
+        self._buckets = {}
+
+    def _for(self, host):
+        if host not in self._slots:
+            self._slots[host] = asyncio.Semaphore(self.per_host)
+            self._buckets[host] = TokenBucket(self.rate, self.burst)
+        return self._slots[host], self._buckets[host]
+
+    async def fetch(self, session, url):
+        """GET under the host's limits, returns (status, final_url, html)"""
+        slot, bucket = self._for(urlsplit(url).netloc)
+
+        async with AsyncExitStack() as stack:
+            # queueing for a slot and a token is WAIT, only the request is FETCH
+            with timing.stage(timing.WAIT):
+                await stack.enter_async_context(slot)
+                await bucket.acquire()
+
+            with timing.stage(timing.FETCH):
+                try:
+                    async with session.get(url, timeout=aiohttp.ClientTimeout(total=TIMEOUT)) as resp:
+                        return resp.status, str(resp.url), await resp.text()
+                except (aiohttp.ClientError, asyncio.TimeoutError):
+                    return 0, url, None
+
+# =========================
+# PIPELINE
+# =========================
+
+async def _lookup_all(items, url_for, parse, on_result, site, limiter, on_needs_browser=None):
+    needs_browser = []
+    browser = object()  # one()'s answer for "raised NeedsBrowser"
+
+    async def one(item):
+        # every task runs in its own context, so stages land on the right
+        # item, and the parse is part of the item's lookup span
+        with timing.item(site, item):
+            try:
+                url = url_for(item)
+            except Exception:
+                url = None
+            if url is None:
+                # no URL can be built for this name
+                return item, 0, price_cache.NOT_FOUND
+
+            status, final_url, html = await limiter.fetch(session, url)
+            try:
+                return item, status, parse(item, status, final_url, html)
+            except NeedsBrowser:
+                return item, status, browser
+            except Exception as e:
+                # a failed parse is not an answer — not cached, retried next run
+                print(f"✖ Parse error for {item}: {e}")
+                return item, status, None
+
+    connector = aiohttp.TCPConnector(limit_per_host=limiter.per_host)
+    async with aiohttp.ClientSession(headers=HEADERS, connector=connector) as session:
+        tasks = [asyncio.create_task(one(item)) for item in items]
+
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                item, status, raw = await next_done
+                if raw is browser:
+                    if not needs_browser and on_needs_browser:
+                        on_needs_browser()
+                    needs_browser.append(item)
+                    continue
+
+                if site and raw == price_cache.NOT_FOUND:
+                    price_cache.put_negative(site, item, "404" if status == 404 else "no price")
+                elif site and raw is not None:
+                    price_cache.put(site, item, raw)
+                on_result(item, raw)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    return needs_browser
+
+
+def run_lookups(items, url_for, parse, on_result, site=None,
+                per_host=None, rate=None, burst=None, on_needs_browser=None) -> list:
+    """Fetch every item's product page concurrently and stream prices back.
+
+    url_for(item) builds the URL (None = nothing to fetch), parse(item,
+    status, final_url, html) returns the raw price, NOT_FOUND, None (no
+    answer, not cached) or raises NeedsBrowser.
+    on_result(item, raw) is called as soon as each page is parsed. Cached
+    items (positive or negative) are answered without a request. Returns
+    the items that still need Selenium. on_needs_browser() is called once,
+    at the first such item, e.g. to start Chrome while the rest is fetched.
+    Limits default to the module CONFIG at call time, so a worker process
+    can scale them down.
+    """
+    pending = []
+    for item in items:
+        if site:
+            if price_cache.get_negative(site, item):
+                on_result(item, price_cache.NOT_FOUND)
+                continue
+            hit, value = price_cache.get(site, item)
+            if hit:
+                on_result(item, value)
+                continue
+        pending.append(item)
+
+    limiter = HostLimiter(per_host or PER_HOST, rate or RATE, burst or BURST)
+    return asyncio.run(_lookup_all(pending, url_for, parse, on_result, site, limiter, on_needs_browser))
@@ -0,0 +1,537 @@
+import argparse
+import importlib
+import json
+import os
+import re
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+from selenium.common.exceptions import NoSuchElementException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.remote.webelement import WebElement
+
+import async_fetch
+import html_parse
+import http_fetch
+import price_cache
+
+# =========================
+# CONFIG
+# =========================
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_fixtures")
+ROUNDS = 20
+
+# the local server has no reason to be throttled like a live site
+BENCH_PER_HOST = 16
+BENCH_RATE = 1000.0
+BENCH_BURST = 16
+
+# items/sec drop (vs. --baseline) reported as a regression
+REGRESSION_TOLERANCE = 0.10
+
+# site → (module, url builder) for the product-page sites
+HTTP_SITES = {
+    "keydrop": ("keydrop_parser", "product_url"),
+    "farmskins": ("farmskins_parser", "product_url"),
+    "skinclub": ("skinclub_parser", "skinclub_url"),
+}
+HTTP_ENGINES = ("parse", "http", "async")
+
+# site → (module, lookup) for the search-box sites, driven by FakeDriver
+SEARCH_SITES = {
+    "ggdrop": ("ggdrop_parser", "get_price"),
+    "casedrop": ("casedrop_parser", "get_skin_price"),
+    "csgocases": ("csgocases_parser", "lookup_price"),
+}
+
+# site → module with parse_case(driver, url)
+CASE_SITES = {
+    "g4skins": "g4skins_parser",
+    "csgoskins": "csgoskins_parser",
+}
+
+ALL_SITES = [*HTTP_SITES, *SEARCH_SITES, *CASE_SITES]
+
+# =========================
+# FIXTURES
+# =========================
+
+def cases_path(site: str) -> str:
+    return os.path.join(FIXTURE_DIR, site, "cases.json")
+
+
+def load_cases(site: str) -> list[dict]:
+    """cases.json entries with the snapshot HTML attached as "html" """
+    with open(cases_path(site), encoding="utf-8") as f:
+        cases = json.load(f)["cases"]
+
+    for case in cases:
+        with open(os.path.join(FIXTURE_DIR, site, case["file"]), encoding="utf-8") as f:
+            case["html"] = f.read()
+    return cases
+
+
+def save_case(site: str, key: str, value: str, html: str):
+    """Store one snapshot and point cases.json at it (replacing an older one)"""
+    os.makedirs(os.path.join(FIXTURE_DIR, site), exist_ok=True)
+    file = re.sub(r"[^a-z0-9]+", "-", value.lower()).strip("-") + ".html"
+
+    with open(os.path.join(FIXTURE_DIR, site, file), "w", encoding="utf-8") as f:
+        f.write(html)
+
+    data = {"cases": []}
+    if os.path.exists(cases_path(site)):
+        with open(cases_path(site), encoding="utf-8") as f:
+            data = json.load(f)
+
+    data["cases"] = [c for c in data["cases"] if c.get(key) != value]
+    data["cases"].append({key: value, "file": file})
+
+    with open(cases_path(site), "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+    print(f"📸 {site}: saved {value} → {file}")
+
+# =========================
+# MEASURE
+# =========================
+
+def percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, round(q * (len(ordered) - 1)))]
+
+
+def current_rss() -> int:
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        import resource
+        # ru_maxrss is already a peak; KiB on Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class PeakRss:
+    """Samples RSS in the background while the block runs"""
+
+    INTERVAL = 0.01
+
+    def __enter__(self):
+        self.peak = current_rss()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def _sample(self):
+        while not self._stop.wait(self.INTERVAL):
+            self.peak = max(self.peak, current_rss())
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, current_rss())
+
+
+def result(site, engine, latencies, wall, rss, found) -> dict:
+    row = {
+        "site": site,
+        "engine": engine,
+        "lookups": len(latencies),
+        "found": found,
+        "items_per_sec": round(len(latencies) / wall, 1) if wall else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "peak_rss_mb": round(rss / 2**20, 1),
+    }
+    print(
+        f"{site:<10} {engine:<7} {row['lookups']:>6} {row['found']:>6} "
+        f"{row['items_per_sec']:>10} {row['p50_ms']:>9} {row['p95_ms']:>9} {row['peak_rss_mb']:>9}"
+    )
+    return row
+
+
+def timed_calls(calls) -> tuple[list[float], float, int, int]:
+    """Run zero-arg callables one by one → (latencies, wall, peak rss, found)"""
+    latencies, found = [], 0
+    with PeakRss() as rss:
+        start = time.perf_counter()
+        for call in calls:
+            t = time.perf_counter()
+            value = call()
+            latencies.append(time.perf_counter() - t)
+            found += value not in (None, [], price_cache.NOT_FOUND)
+        wall = time.perf_counter() - start
+    return latencies, wall, rss.peak, found
+
+# =========================
+# LOCAL SERVER
+# =========================
+
+class FixtureHandler(SimpleHTTPRequestHandler):
+    """/<site>/items/<file> → bench_fixtures/<site>/<file>"""
+
+    def translate_path(self, path):
+        parts = path.split("?")[0].strip("/").split("/")
+        return os.path.join(FIXTURE_DIR, parts[0], parts[-1])
+
+    def log_message(self, *args):
+        pass
+
+
+class FixtureServer(ThreadingHTTPServer):
+    # the default backlog of 5 drops SYNs under the async engine (1 s retries)
+    request_queue_size = 128
+    daemon_threads = True
+
+
+def serve_fixtures() -> tuple[FixtureServer, str]:
+    server = FixtureServer(("127.0.0.1", 0), FixtureHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+# =========================
+# FAKE DRIVER
+# =========================
+
+_BY_CSS = {
+    By.CSS_SELECTOR: "{}",
+    By.CLASS_NAME: ".{}",
+    By.TAG_NAME: "{}",
+    By.ID: "#{}",
+}
+
+
+class FakeElement(WebElement):
+    """WebElement over a parsed snapshot node; ActionChains accept it as-is"""
+
+    def __init__(self, driver, node):
+        super().__init__(driver, f"fake-{id(node)}")
+        self._node = node
+
+    @property
+    def text(self):
+        return self._node.get_text(" ", strip=True)
+
+    def get_attribute(self, name):
+        return self._node.get(name)
+
+    def click(self):
+        pass
+
+    def send_keys(self, *value):
+        pass
+
+    def clear(self):
+        pass
+
+    def is_enabled(self):
+        return True
+
+    def is_displayed(self):
+        return True
+
+    def find_elements(self, by=By.ID, value=None):
+        return self._parent.wrap(self._parent.select(self._node, by, value))
+
+    def find_element(self, by=By.ID, value=None):
+        return self._parent.first(self.find_elements(by, value), value)
+
+
+class FakeDriver:
+    """Just enough WebDriver to replay snapshots through the parsers.
+
+    Every readiness probe reports a changed, idle page, so waits return
+    on the first poll and only the extraction path is measured.
+    """
+
+    session_id = "fake"
+
+    def __init__(self, pages: dict | None = None):
+        self.pages = pages or {}
+        self.current_url = "about:blank"
+        self._mutations = 0
+        self.load("")
+
+    def load(self, html: str):
+        self.page_source = html
+        self._soup = html_parse.parse_html(html)
+        self._mutations += 1
+
+    def get(self, url):
+        self.current_url = url
+        self.load(self.pages.get(url, ""))
+
+    def select(self, node, by, value):
+        css = _BY_CSS.get(by)
+        return node.select(css.format(value)) if css else []
+
+    def wrap(self, nodes):
+        return [FakeElement(self, node) for node in nodes]
+
+    def first(self, elements, value):
+        if not elements:
+            raise NoSuchElementException(value)
+        return elements[0]
+
+    def find_elements(self, by=By.ID, value=None):
+        return self.wrap(self.select(self._soup, by, value))
+
+    def find_element(self, by=By.ID, value=None):
+        return self.first(self.find_elements(by, value), value)
+
+    def execute_script(self, script, *args):
+        if "__ready" in script:
+            self._mutations += 1
+            return {
+                "count": len(self._soup.select(args[0])),
+                "mutations": self._mutations,
+                "inflight": 0,
+                "idle": 1.0,
+            }
+        if "outerHTML" in script:
+            return "".join(str(node) for node in self._soup.select(args[0]))
+        return None
+
+    def execute(self, command, params=None):
+        # ActionChains.perform() ends up here
+        return {"value": None}
+
+    def execute_cdp_cmd(self, cmd, params):
+        return {}
+
+    def quit(self):
+        pass
+
+# =========================
+# BENCHMARKS
+# =========================
+
+def bench_parse(site, module, cases, rounds):
+    """price_from_response on the snapshot, no I/O"""
+    calls = [
+        (lambda c=c: module.price_from_response(c["item"], 200, f"https://{site}/items/{c['file']}", c["html"]))
+        for _ in range(rounds) for c in cases
+    ]
+    return result(site, "parse", *timed_calls(calls))
+
+
+def bench_http(site, module, cases, rounds, base_url):
+    """requests keep-alive session against the local server, one by one"""
+    def call(case):
+        url = f"{base_url}/{site}/items/{case['file']}"
+        status, html = http_fetch.fetch(url)
+        return module.price_from_response(case["item"], status, url, html)
+
+    calls = [(lambda c=c: call(c)) for _ in range(rounds) for c in cases]
+    return result(site, "http", *timed_calls(calls))
+
+
+def bench_async(site, module, cases, rounds, base_url):
+    """async_fetch.run_lookups over every case × rounds at once.
+
+    Latency is request start → parsed, queueing for a host slot included.
+    """
+    urls = {}
+    for r in range(rounds):
+        for case in cases:
+            # the same item in several rounds needs its own key
+            urls[f"{case['item']}#{r}"] = (f"{base_url}/{site}/items/{case['file']}", case["item"])
+
+    started, latencies = {}, []
+    found = 0
+
+    def url_for(key):
+        started[key] = time.perf_counter()
+        return urls[key][0]
+
+    def parse(key, status, final_url, html):
+        return module.price_from_response(urls[key][1], status, final_url, html)
+
+    def on_result(key, raw):
+        nonlocal found
+        latencies.append(time.perf_counter() - started.get(key, time.perf_counter()))
+        found += raw not in (None, price_cache.NOT_FOUND)
+
+    with PeakRss() as rss:
+        start = time.perf_counter()
+        async_fetch.run_lookups(
+            list(urls), url_for, parse, on_result,
+            per_host=BENCH_PER_HOST, rate=BENCH_RATE, burst=BENCH_BURST,
+        )
+        wall = time.perf_counter() - start
+
+    return result(site, "async", latencies, wall, rss.peak, found)
+
+
+def bench_search(site, module, fn_name, cases, rounds):
+    """The site's search lookup on FakeDriver, price cache bypassed"""
+    lookup = getattr(module, fn_name).__wrapped__
+    driver = FakeDriver()
+
+    def call(case):
+        driver.load(case["html"])
+        search_input = FakeElement(driver, driver._soup)
+        return lookup(driver, search_input, case["item"])
+
+    calls = [(lambda c=c: call(c)) for _ in range(rounds) for c in cases]
+    return result(site, "driver", *timed_calls(calls))
+
+
+def bench_cases(site, module, cases, rounds):
+    """parse_case per case page on FakeDriver; one lookup = one case"""
+    driver = FakeDriver({case["url"]: case["html"] for case in cases})
+
+    def call(case):
+        _, rows = module.parse_case(driver, case["url"])
+        return rows or None
+
+    calls = [(lambda c=c: call(c)) for _ in range(rounds) for c in cases]
+    return result(site, "case", *timed_calls(calls))
+
+
+def run(sites, engines=HTTP_ENGINES, rounds=ROUNDS) -> list[dict]:
+    print(f"{'site':<10} {'engine':<7} {'calls':>6} {'found':>6} {'items/s':>10} {'p50 ms':>9} {'p95 ms':>9} {'rss MB':>9}")
+    rows = []
+    server, base_url = serve_fixtures()
+
+    try:
+        for site in sites:
+            cases = load_cases(site)
+
+            if site in HTTP_SITES:
+                module = importlib.import_module(HTTP_SITES[site][0])
+                if "parse" in engines:
+                    rows.append(bench_parse(site, module, cases, rounds))
+                if "http" in engines:
+                    rows.append(bench_http(site, module, cases, rounds, base_url))
+                if "async" in engines:
+                    rows.append(bench_async(site, module, cases, rounds, base_url))
+
+            elif site in SEARCH_SITES:
+                module_name, fn_name = SEARCH_SITES[site]
+                module = importlib.import_module(module_name)
+                rows.append(bench_search(site, module, fn_name, cases, rounds))
+
+            elif site in CASE_SITES:
+                module = importlib.import_module(CASE_SITES[site])
+                rows.append(bench_cases(site, module, cases, rounds))
+    finally:
+        server.shutdown()
+
+    return rows
+
+
+def compare(rows: list[dict], baseline_path: str) -> int:
+    """Print items/sec change vs. a saved run; returns the regression count"""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {(r["site"], r["engine"]): r for r in json.load(f)}
+
+    regressions = 0
+    print(f"\n📊 vs {baseline_path}")
+    for row in rows:
+        old = baseline.get((row["site"], row["engine"]))
+        if not old or not old["items_per_sec"]:
+            continue
+        change = row["items_per_sec"] / old["items_per_sec"] - 1
+        slow = change < -REGRESSION_TOLERANCE
+        regressions += slow
+        print(f"   {'❌' if slow else '✅'} {row['site']}/{row['engine']}: {change:+.1%} items/s")
+
+    return regressions
+
+
+def misses(rows: list[dict]) -> int:
+    """Every fixture has a price, so found < lookups means a parser broke"""
+    broken = [row for row in rows if row["found"] < row["lookups"]]
+    for row in broken:
+        print(f"❌ {row['site']}/{row['engine']}: found {row['found']} of {row['lookups']}")
+    return len(broken)
+
+# =========================
+# RECORD
+# =========================
+
+def record(site: str, targets: list[str]):
+    """Save live pages as fixtures.
+
+    Product-page sites are fetched by item name. For the browser sites
+    the current tab of the debug Chrome (port 9222) is saved as-is, so
+    run the search / open the case there first.
+    """
+    if site in HTTP_SITES:
+        module_name, url_fn = HTTP_SITES[site]
+        module = importlib.import_module(module_name)
+        for item in targets:
+            status, html = http_fetch.fetch(getattr(module, url_fn)(item))
+            if status != 200 or not html:
+                print(f"❌ {site}: {item} → HTTP {status}")
+                continue
+            save_case(site, "item", item, html)
+        return
+
+    from selenium.webdriver.chrome.options import Options
+
+    import driver_factory
+
+    options = Options()
+    options.add_experimental_option("debuggerAddress", "127.0.0.1:9222")
+    driver = driver_factory.chrome(options)
+
+    try:
+        key = "url" if site in CASE_SITES else "item"
+        for target in targets:
+            value = driver.current_url if key == "url" else target
+            save_case(site, key, value, driver.page_source)
+    finally:
+        driver.quit()
+
+# =========================
+# ENTRYPOINT
+# =========================
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline parser benchmarks on saved snapshots")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_cmd = sub.add_parser("run", help="replay fixtures and report items/s, p50/p95, peak RSS")
+    run_cmd.add_argument("sites", nargs="*", help=f"any of {', '.join(ALL_SITES)} (default: all)")
+    run_cmd.add_argument("--engines", default=",".join(HTTP_ENGINES))
+    run_cmd.add_argument("--rounds", type=int, default=ROUNDS)
+    run_cmd.add_argument("--json", help="save results here")
+    run_cmd.add_argument("--baseline", help="compare with a saved --json run")
+
+    record_cmd = sub.add_parser("record", help="save live pages as fixtures")
+    record_cmd.add_argument("site", choices=ALL_SITES)
+    record_cmd.add_argument("targets", nargs="+", help="item names (case sites: any label)")
+
+    args = parser.parse_args()
+
+    if args.command == "record":
+        record(args.site, args.targets)
+        return
+
+    unknown = set(args.sites) - set(ALL_SITES)
+    if unknown:
+        parser.error(f"unknown site(s): {', '.join(sorted(unknown))}")
+
+    rows = run(args.sites or ALL_SITES, args.engines.split(","), args.rounds)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2)
+        print(f"\n💾 Results saved to {args.json}")
+
+    failed = misses(rows)
+    if args.baseline:
+        failed += compare(rows, args.baseline)
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+from contextlib import contextmanager
+from functools import partial
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+
+import timing
+from driver_pool import DriverPool
+
+# =========================
+# CONFIG
+# =========================
+
+DEBUGGER_ADDRESS = "127.0.0.1:9222"
+WORKERS = 6
+
+# =========================
+# TABS IN THE DEBUG CHROME
+# =========================
+
+def attach_tab(service_path: str, debugger_address: str = DEBUGGER_ADDRESS) -> webdriver.Chrome:
+    """New tab in the already running (logged in) Chrome, with its own session"""
+    options = Options()
+    options.add_experimental_option("debuggerAddress", debugger_address)
+
+    driver = webdriver.Chrome(service=Service(service_path), options=options)
+    driver.switch_to.new_window("tab")
+    # background tabs otherwise skip hover / render work
+    driver.execute_cdp_cmd("Emulation.setFocusEmulationEnabled", {"enabled": True})
+    return driver
+
+
+def close_tab(driver):
+    driver.close()
+
+
+@contextmanager
+def own_tab(driver, url: str):
+    """url in a new tab of the attached Chrome, closed again on exit.
+
+    The tabs the user (or the previous site of a runner lane) left open
+    are not touched.
+    """
+    driver.switch_to.new_window("tab")
+    try:
+        with timing.stage(timing.NAVIGATE):
+            driver.get(url)
+        yield
+    finally:
+        try:
+            close_tab(driver)
+        except Exception:
+            pass
+
+# =========================
+# CRAWL
+# =========================
+
+def crawl_cases(case_urls, parse_case, store, existing: set, workers: int = WORKERS,
+                debugger_address: str = DEBUGGER_ADDRESS):
+    """Open case pages in `workers` tabs at once and store every new price.
+
+    parse_case(driver, url) returns (case_name, [(hash_name, price), ...])
+    or None. Only the calling thread touches `existing` and the store, so
+    dedup and writes need no locking.
+    """
+    def on_result(i, url, result):
+        if result is None:
+            print(f"⚠️ [{i + 1}/{len(case_urls)}] Nothing parsed: {url}")
+            return
+
+        case_name, rows = result
+        new_rows = []
+        for full_name, price in rows:
+            if full_name in existing:
+                continue
+            existing.add(full_name)
+            new_rows.append((full_name, price))
+            print(f"   ✔ {full_name} = {price}")
+
+        store.append(new_rows)
+        print(f"💾 [{i + 1}/{len(case_urls)}] Saved case: {case_name} ({len(new_rows)} new)")
+
+    def timed_case(driver, url):
+        # one case page is the crawl's "item" in the timing trace
+        with timing.item(store.site, url):
+            return parse_case(driver, url)
+
+    factory = partial(attach_tab, debugger_address=debugger_address)
+    with DriverPool(workers, factory=factory, teardown=close_tab) as pool:
+        pool.map(timed_case, case_urls, on_result)
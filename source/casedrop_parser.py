@@ -1,20 +1,27 @@
 import os
-import time
 import re
 import json
 import pandas as pd
-from bs4 import BeautifulSoup
 
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.support import expected_conditions as EC
 
-from webdriver_manager.chrome import ChromeDriverManager
+
+import case_crawler
+import catalog
+import checkpoint
+import driver_factory
+import html_parse
+import network_capture
+import price_cache
+import readiness
+import timing
+import workbook
 
 
 # =========================
@@ -24,9 +31,22 @@ DEBUGGER_ADDR = "127.0.0.1:9222"
 
 EXCEL_FILE = "Problematic Withdrawals.xlsx"
 ITEM_COL = "steam_market_hash_name"
+SITE = "casedrop"
 PRICE_COL = "casedrop_price"
 
+START_URL = "https://casedrop.eu/shop"  # the shop page with the search input
 SEARCH_INPUT_XPATH = "//input[@placeholder='Enter item name']"
+RESULT_SELECTOR = ".shop_items_list .item_container, .shop_items_list .itemEmpty"
+
+# ціни беремо з JSON, який сторінка тягне через XHR, DOM — лише запасний варіант
+# off until the endpoint and API_PRICE_SCALE are checked against a real payload
+CAPTURE_JSON = False
+API_URL_PART = "casedrop.eu/api/"
+API_PRICE_SCALE = 1  # 100 if the API turns out to send cents
+
+# один прохід по всьому магазину замість пошуку на кожен рядок
+SNAPSHOT = True
+CARD_SELECTOR = ".shop_items_list .item_container"
 
 
 # =========================
@@ -35,10 +55,10 @@ SEARCH_INPUT_XPATH = "//input[@placeholder='Enter item name']"
 def get_debugger_driver() -> webdriver.Chrome:
     options = Options()
     options.add_experimental_option("debuggerAddress", DEBUGGER_ADDR)
+    if CAPTURE_JSON:
+        network_capture.enable_capture(options)
 
-    service = Service(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service, options=options)
-    return driver
+    return driver_factory.chrome(options)
 
 
 def get_search_input(driver):
@@ -50,15 +70,34 @@ def get_search_input(driver):
 # =========================
 # PRICE PARSING
 # =========================
-def extract_price_number(text: str) -> float:
+@timing.timed(timing.PRICE_PARSE)
+def extract_price_number(text) -> float:
+    if isinstance(text, float):
+        return text
     cleaned = re.sub(r"[^\d.,]", "", text)
     cleaned = cleaned.replace(",", ".")
     return float(cleaned)
 
 
-def get_skin_price(driver, search_input, skin_name: str):
+@price_cache.cached(SITE, precheck=price_cache.not_a_skin)
+def get_skin_price(driver, search_input, skin_name: str, capture=None, index=None):
+    if "|" not in skin_name:
+        return price_cache.NOT_FOUND
+
+    # in the catalog snapshot taken at the start of the run
+    snapped = index.get(skin_name) if index else None
+    if snapped is not None:
+        return snapped
+
+    # already in a payload captured for an earlier search / the catalog
+    captured = capture.lookup(skin_name) if capture else None
+    if captured is not None:
+        return captured
+
     try:
-        WebDriverWait(driver, 15).until(lambda d: search_input.is_enabled())
+        with timing.stage(timing.WAIT):
+            WebDriverWait(driver, 15).until(lambda d: search_input.is_enabled())
+        before = readiness.snapshot(driver, RESULT_SELECTOR)
 
         # search_input.click()
         # search_input.send_keys(Keys.CONTROL + "a")
@@ -76,28 +115,28 @@ def get_skin_price(driver, search_input, skin_name: str):
             .send_keys(Keys.ENTER) \
             .perform()
         
-        time.sleep(0.5)
+        readiness.wait_for_change(driver, RESULT_SELECTOR, before)
+
+        captured = capture.lookup(skin_name) if capture else None
+        if captured is not None:
+            return captured
 
         # NO ITEMS
         try:
             no_items = driver.find_element(By.CSS_SELECTOR, ".shop_items_list .itemEmpty")
             if "NO ITEMS" in no_items.text.upper():
-                return None
+                return price_cache.NOT_FOUND
         except:
             pass
 
-        if "|" not in skin_name:
-            return None
-
-        items = driver.find_elements(By.CSS_SELECTOR, ".shop_items_list .item_container")
+        # один запит до браузера і один парс на всю видачу
+        items = html_parse.select_on_page(driver, ".shop_items_list .item_container")
         if not items:
             return None
 
         is_stattrak = "stattrak" in skin_name.lower()
 
-        for item in items:
-            soup = BeautifulSoup(item.get_attribute("innerHTML"), "html.parser")
-
+        for soup in items:
             has_track = soup.find("div", class_="info_track") is not None
 
             if not is_stattrak and has_track:
@@ -109,13 +148,32 @@ def get_skin_price(driver, search_input, skin_name: str):
             if price_el:
                 return price_el.text.strip()
 
-        return None
+        # results came back, none of them is this (non-)StatTrak variant
+        return price_cache.NOT_FOUND
 
     except Exception as e:
         print(f"❌ Error for {skin_name}: {e}")
         return None
 
 
+# =========================
+# CATALOG SNAPSHOT
+# =========================
+def parse_card(card):
+    img = card.find("img")
+    price_el = card.find("div", class_="info_price")
+    if not img or not img.get("alt") or price_el is None:
+        return None
+
+    stattrak = card.find("div", class_="info_track") is not None
+    return img["alt"].strip(), price_el.text.strip(), stattrak, False
+
+
+def snapshot_catalog(driver, capture=None) -> catalog.CatalogIndex:
+    """Scroll the unfiltered shop list to the end once and index every card"""
+    return catalog.crawl_grid(driver, catalog.CatalogIndex(SITE), CARD_SELECTOR, parse_card, capture=capture)
+
+
 # =========================
 # EXCEL WORKFLOW
 # =========================
@@ -132,59 +190,89 @@ def choose_sheets(xls: pd.ExcelFile) -> list[str]:
     return [xls.sheet_names[int(choice) - 1]]
 
 
-def process_sheets(sheet_names):
-    driver = get_debugger_driver()
-    search_input = get_search_input(driver)
+def to_price(raw):
+    if raw is None or raw == price_cache.NOT_FOUND:
+        return raw
+    try:
+        return extract_price_number(raw)
+    except Exception:
+        return None
 
-    xls = pd.ExcelFile(EXCEL_FILE)
 
-    writer = pd.ExcelWriter(
-        EXCEL_FILE,
-        engine="openpyxl",
-        mode="a",
-        if_sheet_exists="replace",
-    )
+def prepare(items):
+    """Nothing to build up front, prices come from the shop tab"""
+
+
+def price_items(items, on_price):
+    """Every lookup pass over items; on_price(item, price or None) per item"""
+    driver = get_debugger_driver()
 
     try:
-        total = len(sheet_names)
-        idx = 0
+        capture = None
+        if CAPTURE_JSON:
+            capture = network_capture.NetworkCapture(driver, API_URL_PART, API_PRICE_SCALE)
 
-        for sheet in xls.sheet_names:
-            df = pd.read_excel(xls, sheet_name=sheet)
+        # own tab: the debug Chrome is shared with the other sites of a runner lane
+        with case_crawler.own_tab(driver, START_URL):
+            search_input = get_search_input(driver)
 
-            if sheet in sheet_names and ITEM_COL in df.columns:
-                idx += 1
-                print(f"\n=== Processing sheet {idx}/{total}: {sheet} ===")
+            # per item: price cache, then this snapshot (hits are cached too), then a search
+            # for what the snapshot missed (lazy-loaded, layout changed…)
+            index = None
+            if SNAPSHOT:
+                readiness.wait_for_change(driver, CARD_SELECTOR)
+                index = snapshot_catalog(driver, capture)
 
-                prices = []
-                items = df[ITEM_COL].astype(str).tolist()
+            for item in items:
+                raw = get_skin_price(driver, search_input, item, capture=capture, index=index)
+                on_price(item, to_price(raw))
 
-                for i, item in enumerate(items, start=1):
-                    raw = get_skin_price(driver, search_input, item)
+    finally:
+        driver.quit()
+        print("Chrome detached")
 
-                    if raw is None:
-                        prices.append("-")
-                        print(f"[{i}/{len(items)}] ❌ {item}")
-                    else:
-                        try:
-                            price = extract_price_number(raw)
-                            prices.append(price)
-                            print(f"[{i}/{len(items)}] ✅ {item} → {price}")
-                        except Exception:
-                            prices.append("-")
-                            print(f"[{i}/{len(items)}] ❌ {item}")
 
-                df[PRICE_COL] = prices
+@timing.traced(SITE)
+def process_sheets(sheet_names, write=True):
+    xls = pd.ExcelFile(EXCEL_FILE)
+    frames = workbook.read_sheets(xls, sheet_names)
+    items = workbook.plan_items(frames, sheet_names, ITEM_COL)
+
+    price_map = checkpoint.PriceJournal(SITE, EXCEL_FILE, frames, sheet_names, ITEM_COL)
+    items = price_map.pending(items)
+    done = 0
+
+    def report(item, price):
+        nonlocal done
+        done += 1
+        if price is None:
+            price_map.fail(item)
+            print(f"[{done}/{len(items)}] ❌ {item}")
+        else:
+            price_map[item] = price
+            print(f"[{done}/{len(items)}] ✅ {item} → {price}")
 
-            df.to_excel(writer, sheet_name=sheet, index=False)
+    try:
+        if items:
+            price_items(items, report)
 
     except KeyboardInterrupt:
         print("\n⚠ Interrupted by user (Ctrl+C)")
+        print(f"💾 Progress kept in {price_map.path}, re-run to resume")
+        return
 
     finally:
-        writer.close()
-        driver.quit()
-        print("💾 Excel saved, Chrome detached")
+        price_map.close()
+
+    # merge.py writes every site in one pass
+    if not write:
+        price_map.mark_complete()
+        print(f"📒 Prices kept in {price_map.path} for merge.py")
+        return
+
+    workbook.write_prices(EXCEL_FILE, sheet_names, PRICE_COL, price_map.with_failed(), ITEM_COL)
+    price_map.finish()
+    print("💾 Excel saved")
 
 
 # =========================
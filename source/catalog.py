@@ -0,0 +1,106 @@
+import html_parse
+import names
+import readiness
+
+# =========================
+# CONFIG
+# =========================
+
+STATTRAK = "StatTrak™"
+SOUVENIR = "Souvenir"
+STAR = "★"
+
+MAX_SCROLLS = 1000
+
+# =========================
+# KEYS
+# =========================
+
+def catalog_key(name: str, stattrak: bool = False, souvenir: bool = False) -> tuple:
+    """(base name, stattrak, souvenir) for a hash name or a site's card title.
+
+    Sites show StatTrak/Souvenir as a badge or in the title and may drop
+    the ★, so both sides are reduced to the same key. Short codes like
+    "FT" / "ST" are expanded by names.normalize first.
+    """
+    name = names.normalize(name)
+
+    stattrak = stattrak or STATTRAK in name
+    souvenir = souvenir or name.startswith(SOUVENIR + " ")
+
+    for token in (STAR, STATTRAK):
+        name = name.replace(token, " ")
+    if souvenir:
+        name = name.replace(SOUVENIR + " ", " ", 1)
+
+    return " ".join(name.split()), stattrak, souvenir
+
+# =========================
+# INDEX
+# =========================
+
+class CatalogIndex:
+    """hash_name → price for a whole site catalog, built in one pass.
+
+    Rows are answered by dictionary lookup instead of one search each.
+    The first price seen for a key wins.
+    """
+
+    def __init__(self, site: str):
+        self.site = site
+        self._prices = {}
+
+    def add(self, name: str, price, stattrak: bool = False, souvenir: bool = False) -> bool:
+        """Returns True if the key was new"""
+        if not name or price is None:
+            return False
+        key = catalog_key(name, stattrak, souvenir)
+        if key in self._prices:
+            return False
+        self._prices[key] = price
+        return True
+
+    def get(self, hash_name: str):
+        return self._prices.get(catalog_key(hash_name))
+
+    def __contains__(self, hash_name) -> bool:
+        return catalog_key(hash_name) in self._prices
+
+    def __len__(self) -> int:
+        return len(self._prices)
+
+# =========================
+# CRAWL
+# =========================
+
+def crawl_grid(driver, index: CatalogIndex, card_selector: str, parse_card,
+               max_scrolls: int = MAX_SCROLLS, capture=None) -> CatalogIndex:
+    """Scroll a listing to the end once and index every card.
+
+    parse_card(soup) returns (name, price, stattrak, souvenir) or None.
+    Cards are parsed after every scroll step, so a grid that recycles
+    off-screen cards is still covered; scrolling stops once a step adds
+    nothing new. JSON seen by a network_capture.NetworkCapture on the
+    way fills in names the cards lack.
+    """
+    for _ in range(max_scrolls):
+        added = 0
+        for card in html_parse.select_on_page(driver, card_selector):
+            parsed = parse_card(card)
+            if parsed:
+                added += index.add(*parsed)
+
+        if not added:
+            break
+
+        before = readiness.snapshot(driver, card_selector)
+        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+        readiness.wait_for_change(driver, card_selector, before)
+
+    if capture:
+        capture.collect()
+        for name, price in capture.prices.items():
+            index.add(name, price)
+
+    print(f"📚 {index.site}: {len(index)} catalog items indexed")
+    return index
@@ -0,0 +1,159 @@
+import json
+import os
+import threading
+
+from workbook import ITEM_COL, MISSING
+
+# =========================
+# CONFIG
+# =========================
+
+JOURNAL_DIR = "."
+
+
+def journal_path(excel_file: str, site: str) -> str:
+    base = os.path.splitext(os.path.basename(excel_file))[0]
+    return os.path.join(JOURNAL_DIR, f"{base}.{site}.journal.jsonl")
+
+# =========================
+# JOURNAL
+# =========================
+
+class PriceJournal(dict):
+    """item → price map that appends every assignment to a journal file.
+
+    Each price is written as one JSON line per (sheet, row, site, price)
+    the item appears in, and flushed right away, so a crash loses at most
+    the item in progress. On start the journal is replayed: rows whose
+    item still matches the workbook are pre-filled and skipped.
+
+    A lookup that failed (timeout, dead driver…) is not a price: fail()
+    keeps it out of the journal, so the item stays pending for the next
+    run, while a site that has no such item is journaled as "-".
+    """
+
+    def __init__(self, site, excel_file, frames, sheet_names, item_col=ITEM_COL):
+        super().__init__()
+        self.site = site
+        self.sheets = list(sheet_names)
+        self.path = journal_path(excel_file, site)
+        self.failed = set()
+        self._lock = threading.Lock()
+
+        self.rows = {}
+        for sheet in sheet_names:
+            df = frames.get(sheet)
+            if df is None or item_col not in df.columns:
+                continue
+            for row, item in enumerate(df[item_col].astype(str).tolist()):
+                self.rows.setdefault(item, []).append((sheet, row))
+
+        self._replay()
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    def _replay(self):
+        if not os.path.exists(self.path):
+            return
+
+        positions = {pos: item for item, rows in self.rows.items() for pos in rows}
+
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    rec = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # half-written last line after a crash
+
+                if rec.get("site") != self.site or "item" not in rec:
+                    continue  # another site's line or a complete marker
+                # the workbook may have changed since — only trust matching rows
+                if positions.get((rec["sheet"], rec["row"])) == rec["item"]:
+                    super().__setitem__(rec["item"], rec["price"])
+
+        if self:
+            print(f"↩ Resuming {self.site}: {len(self)} items already priced in {self.path}")
+
+    def __setitem__(self, item, price):
+        super().__setitem__(item, price)
+        self.failed.discard(item)
+
+        lines = [
+            json.dumps(
+                {"sheet": sheet, "row": row, "site": self.site, "item": item, "price": price},
+                ensure_ascii=False,
+            )
+            for sheet, row in self.rows.get(item, [])
+        ]
+        with self._lock:
+            self._file.write("".join(line + "\n" for line in lines))
+            self._file.flush()
+
+    def fail(self, item):
+        """The lookup failed, retry the item on the next run"""
+        if item not in self:
+            self.failed.add(item)
+
+    def pending(self, items) -> list:
+        return [item for item in items if item not in self]
+
+    def with_failed(self) -> dict:
+        """Prices plus "-" for failed items, to write the sheets this run"""
+        return {**dict.fromkeys(self.failed, MISSING), **self}
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+    def mark_complete(self):
+        """Every item was looked up; merge.py only takes journals marked so.
+
+        Not marked while lookups failed, or merge.py would write "-" for
+        them and delete the journal with nothing left to retry.
+        """
+        self.close()
+        if self.failed:
+            self._warn_failed()
+            return
+
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"site": self.site, "complete": True, "sheets": self.sheets}, ensure_ascii=False) + "\n")
+
+    def _warn_failed(self):
+        print(f"⚠ {self.site}: {len(self.failed)} lookup(s) failed, re-run to retry them")
+
+    def finish(self):
+        """Workbook written — the journal is no longer needed, unless items failed"""
+        self.close()
+        if self.failed:
+            self._warn_failed()
+            return
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def read_journal(path: str) -> tuple[dict, set, bool]:
+    """item → price and the sheets covered by a journal file, for the merge stage.
+
+    The flag is True when the journal ends with a complete marker, i.e. its
+    run got through every item; prices appended after the marker come from
+    a resumed run that has not finished yet.
+    """
+    prices, sheets = {}, set()
+    complete = False
+
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                rec = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+            complete = bool(rec.get("complete"))
+            if complete:
+                sheets.update(rec.get("sheets", []))
+                continue
+
+            prices[rec["item"]] = rec["price"]
+            sheets.add(rec["sheet"])
+
+    return prices, sheets, complete
@@ -1,30 +1,48 @@
 import os
 import pandas as pd
-from bs4 import BeautifulSoup
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.common.action_chains import ActionChains
 from openpyxl import Workbook
-import time
+
+import case_crawler
+import catalog
+import checkpoint
+import driver_factory
+import html_parse
+import network_capture
+import price_cache
+import readiness
+import timing
+import workbook
 
 EXCEL_FILE = "Problematic Withdrawals.xlsx"
 ITEM_COL = "steam_market_hash_name"
+SITE = "csgocases"
 PRICE_COL = "csgocases_price"
+RESULT_SELECTOR = ".item-content"
+START_URL = "https://csgocases.com/shop"  # the shop page with the search input
+
+# ціни беремо з JSON, який сторінка тягне через XHR, DOM — лише запасний варіант
+# off until the endpoint and API_PRICE_SCALE are checked against a real payload
+CAPTURE_JSON = False
+API_URL_PART = "csgocases.com/api/"
+API_PRICE_SCALE = 1  # 100 if the API turns out to send cents
+
+# один прохід по всьому магазину замість пошуку на кожен рядок
+SNAPSHOT = True
 
 # def initialize_driver(debug_port="127.0.0.1:9222", driver_path="D:/chromedriver-win64/chromedriver.exe"):
 def initialize_driver():
     """Initialize Chrome WebDriver with existing browser session"""
     options = Options()
     options.add_experimental_option("debuggerAddress", "127.0.0.1:9222")
-    service = Service(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service, options=options)
-    return driver
+    if CAPTURE_JSON:
+        network_capture.enable_capture(options)
+    return driver_factory.chrome(options)
 
 def search_skin(driver, search_input, skin_name):
     """Search for a skin and return the item blocks"""
@@ -32,6 +50,7 @@ def search_skin(driver, search_input, skin_name):
         # Clear existing search text
         # search_input.send_keys(Keys.CONTROL + "a")
         # search_input.send_keys(Keys.DELETE)
+        before = readiness.snapshot(driver, RESULT_SELECTOR)
         ActionChains(driver) \
         .click(search_input) \
         .key_down(Keys.CONTROL) \
@@ -40,24 +59,25 @@ def search_skin(driver, search_input, skin_name):
         .send_keys(Keys.DELETE) \
         .perform()
 
-        time.sleep(1)
+        before = readiness.wait_for_change(driver, RESULT_SELECTOR, before)
         
         # Input the skin name
         search_input.send_keys(skin_name)
-        time.sleep(2)  # Wait for search results
+        readiness.wait_for_change(driver, RESULT_SELECTOR, before)  # Wait for search results
         
-        # Get all item blocks
-        item_blocks = driver.find_elements(By.CLASS_NAME, "item-content")
+        # Get all item blocks (one WebDriver call, parsed once)
+        item_blocks = html_parse.select_on_page(driver, RESULT_SELECTOR)
         
         # ADDED: Clear search if too many results are found and retry
         if len(item_blocks) > 2 or not item_blocks:
             print(f"Too many / zero results for {skin_name}, refining search...")
+            before = readiness.snapshot(driver, RESULT_SELECTOR)
             search_input.send_keys(Keys.CONTROL + "a")
             search_input.send_keys(Keys.ARROW_RIGHT)
             search_input.send_keys(Keys.BACKSPACE)
-            time.sleep(2)  # Wait for refined search results
+            readiness.wait_for_change(driver, RESULT_SELECTOR, before)  # Wait for refined search results
             # Get updated item blocks after refining
-            item_blocks = driver.find_elements(By.CLASS_NAME, "item-content")
+            item_blocks = html_parse.select_on_page(driver, RESULT_SELECTOR)
             print(f"After refining: found {len(item_blocks)} results")
 
         return item_blocks
@@ -65,22 +85,26 @@ def search_skin(driver, search_input, skin_name):
         print(f"Error searching for {skin_name}: {str(e)}")
         return None
 
+@timing.timed(timing.PRICE_PARSE)
+def to_price(text):
+    return float(text.strip().replace('$', '').replace('€', '').replace(',', ''))
+
 def get_skin_price(item_blocks, skin_name):
     """Extract price for the specified skin, handling StatTrak designation"""
     # Determine if we're looking for a StatTrak version
+    if item_blocks is None:
+        return None  # the search itself failed
     if not item_blocks:
         print(f"Error: No results found for skin: {skin_name}")
-        return None
+        return price_cache.NOT_FOUND
 
     is_stattrak = "StatTrak™" in skin_name
     is_souvenir = "Souvenir" in skin_name
     is_knife = "★" in skin_name
+    failed = False
 
-    for item in item_blocks:
+    for soup in item_blocks:
         try:
-            html = item.get_attribute('innerHTML')
-            soup = BeautifulSoup(html, 'html.parser')
-            
             # Find the image with the alt attribute containing the skin name
             img = soup.find('img')
             if not img or not img.get('alt'):
@@ -100,7 +124,7 @@ def get_skin_price(item_blocks, skin_name):
                         price_span = soup.find('span', class_='resell-price-span')
                         if price_span:
                             price_text = price_span.text.strip()
-                            price_float = float(price_text.replace('$', '').replace('€', '').replace(',', ''))
+                            price_float = to_price(price_text)
                             return price_float
                         
             # Check if the alt text matches our search criteria (StatTrak or not)
@@ -111,12 +135,52 @@ def get_skin_price(item_blocks, skin_name):
                     if price_span:
                         # return price_span.text.strip()
                         price_text = price_span.text.strip()
-                        price_float = float(price_text.replace('$', '').replace('€', '').replace(',', ''))
+                        price_float = to_price(price_text)
                         return price_float
         except Exception as e:
             print(f"Error processing item: {str(e)}")
-    
-    return None
+            failed = True
+
+    # a block that failed to parse may have been the match
+    return None if failed else price_cache.NOT_FOUND
+
+def parse_card(card):
+    img = card.find("img")
+    price_span = card.find("span", class_="resell-price-span")
+    if not img or not img.get("alt") or price_span is None:
+        return None
+
+    try:
+        price = to_price(price_span.text)
+    except ValueError:
+        return None
+    return img["alt"].strip(), price, False, False
+
+
+def snapshot_catalog(driver, capture=None) -> catalog.CatalogIndex:
+    """Scroll the unfiltered shop list to the end once and index every block"""
+    return catalog.crawl_grid(driver, catalog.CatalogIndex(SITE), RESULT_SELECTOR, parse_card, capture=capture)
+
+
+@price_cache.cached(SITE, precheck=price_cache.not_a_skin)
+def lookup_price(driver, search_input, skin_name, capture=None, index=None):
+    """Search + extract for one skin; cached and snapshot hits skip the search entirely"""
+    # in the catalog snapshot taken at the start of the run
+    snapped = index.get(skin_name) if index else None
+    if snapped is not None:
+        return snapped
+
+    captured = capture.lookup(skin_name) if capture else None
+    if captured is not None:
+        return captured
+
+    item_blocks = search_skin(driver, search_input, skin_name)
+
+    captured = capture.lookup(skin_name) if capture else None
+    if captured is not None:
+        return captured
+
+    return get_skin_price(item_blocks, skin_name)
 
 # =========================
 # EXCEL WORKFLOW
@@ -134,66 +198,82 @@ def choose_sheets(xls: pd.ExcelFile) -> list[str]:
     return [xls.sheet_names[int(choice) - 1]]
 
 
-def process_sheets(sheet_names):
-    driver = initialize_driver()
+def prepare(items):
+    """Nothing to build up front, prices come from the shop tab"""
 
-    search_input = WebDriverWait(driver, 30).until(
-        EC.presence_of_element_located((By.XPATH, "//input[@placeholder='Search']"))
-    )
 
-    xls = pd.ExcelFile(EXCEL_FILE)
-
-    writer = pd.ExcelWriter(
-        EXCEL_FILE,
-        engine="openpyxl",
-        mode="a",
-        if_sheet_exists="replace",
-    )
+def price_items(items, on_price):
+    """Every lookup pass over items; on_price(item, price or None) per item"""
+    driver = initialize_driver()
 
     try:
-        total = len(sheet_names)
-        idx = 0
-
-        for sheet in xls.sheet_names:
-            df = pd.read_excel(xls, sheet_name=sheet)
-
-            if sheet in sheet_names and ITEM_COL in df.columns:
-                idx += 1
-                print(f"\n=== Processing sheet {idx}/{total}: {sheet} ===")
-
-                prices = []
-                items = df[ITEM_COL].astype(str).tolist()
-
-                for i, item in enumerate(items, start=1):
-                    item_blocks = search_skin(driver, search_input, item)
-                    price = get_skin_price(item_blocks, item)
-
-                    # повторна спроба, як у твоєму main
-                    if price is None and item_blocks:
-                        price = get_skin_price(item_blocks, item)
+        capture = None
+        if CAPTURE_JSON:
+            capture = network_capture.NetworkCapture(driver, API_URL_PART, API_PRICE_SCALE)
+
+        # own tab: the debug Chrome is shared with the other sites of a runner lane
+        with case_crawler.own_tab(driver, START_URL):
+            search_input = WebDriverWait(driver, 30).until(
+                EC.presence_of_element_located((By.XPATH, "//input[@placeholder='Search']"))
+            )
+
+            # per item: price cache, then this snapshot (hits are cached too), then a search
+            # for what the snapshot missed (lazy-loaded, layout changed…)
+            index = None
+            if SNAPSHOT:
+                readiness.wait_for_change(driver, RESULT_SELECTOR)
+                index = snapshot_catalog(driver, capture)
+
+            for item in items:
+                on_price(item, lookup_price(driver, search_input, item, capture=capture, index=index))
 
-                    if price is None:
-                        prices.append("-")
-                        print(f"[{i}/{len(items)}] ❌ {item}")
-                    else:
-                        prices.append(price)
-                        print(f"[{i}/{len(items)}] ✅ {item} → {price}")
+    finally:
+        driver.quit()
+        print("Chrome detached")
 
-                    time.sleep(2)
 
-                df[PRICE_COL] = prices
+@timing.traced(SITE)
+def process_sheets(sheet_names, write=True):
+    xls = pd.ExcelFile(EXCEL_FILE)
+    frames = workbook.read_sheets(xls, sheet_names)
+    items = workbook.plan_items(frames, sheet_names, ITEM_COL)
+
+    price_map = checkpoint.PriceJournal(SITE, EXCEL_FILE, frames, sheet_names, ITEM_COL)
+    items = price_map.pending(items)
+    done = 0
+
+    def report(item, price):
+        nonlocal done
+        done += 1
+        if price is None:
+            price_map.fail(item)
+            print(f"[{done}/{len(items)}] ❌ {item}")
+        else:
+            price_map[item] = price
+            print(f"[{done}/{len(items)}] ✅ {item} → {price}")
 
-            # зберігаємо ЛИСТ ЗА ЛИСТОМ
-            df.to_excel(writer, sheet_name=sheet, index=False)
+    try:
+        if items:
+            price_items(items, report)
 
     except KeyboardInterrupt:
         print("\n⚠ Interrupted by user (Ctrl+C)")
-        print("💾 Saving Excel...")
+        print(f"💾 Progress kept in {price_map.path}, re-run to resume")
+        return
 
     finally:
-        writer.close()
-        driver.quit()
-        print("💾 Excel saved, Chrome detached")
+        price_map.close()
+
+    # merge.py writes every site in one pass
+    if not write:
+        price_map.mark_complete()
+        print(f"📒 Prices kept in {price_map.path} for merge.py")
+        return
+
+    # ціни розкладаються по всіх рядках і листах, де зустрічається айтем
+    workbook.write_prices(EXCEL_FILE, sheet_names, PRICE_COL, price_map.with_failed(), ITEM_COL)
+    price_map.finish()
+    print("💾 Excel saved")
 
 def main():
     if not os.path.exists(EXCEL_FILE):
@@ -1,18 +1,17 @@
-import pandas as pd
-from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
-from bs4 import BeautifulSoup
-from webdriver_manager.chrome import ChromeDriverManager
-from openpyxl import Workbook, load_workbook
-import time
-import os
-import re
+import case_crawler
+import driver_factory
+import html_parse
+import names
+import readiness
+import timing
+import workbook
+from price_store import PriceStore
 
 # =========================
 # CONFIG
@@ -21,119 +20,82 @@ import re
 DEBUGGER_ADDRESS = "127.0.0.1:9222"
 BASE_URL = "https://csgo-skins.com"
 EXCEL_PATH = "csgoskins.xlsx"
-
-wear_map = {
-    "FN": "Factory New",
-    "MW": "Minimal Wear",
-    "FT": "Field-Tested",
-    "WW": "Well-Worn",
-    "BS": "Battle-Scarred"
-}
-
-star_keywords = [
-    "Knife", "Gloves", "Karambit",
-    "Bayonet", "Shadow Daggers", "Hand Wraps"
-]
+SITE = "csgoskins"
+PRICE_COL = "csgoskins_price"
+WORKERS = case_crawler.WORKERS
+CASE_SELECTOR = "article.ContainersContainer"
 
 def clean_name(name: str) -> str:
-    if not isinstance(name, str):
-        return name
-
-    # 1. Прибрати подвійні пробіли
-    name = re.sub(r"\s+", " ", name.strip())
-
-    # 2. Перевірити наявність wear-стану (FN, MW, FT, WW, BS)
-    wear_found = None
-    for short, full in wear_map.items():
-        if re.search(rf"\b{short}\b", name):
-            wear_found = full
-            name = re.sub(rf"\b{short}\b", "", name).strip()
-            break
-
-    # 3. Замінити ST на StatTrak™ (на початку назви)
-    if re.search(r"\bST\b", name):
-        name = re.sub(r"\bST\b", "", name).strip()
-        name = f"StatTrak™ {name}"
-
-    # 4. Якщо в назві є knife/gloves — додати ★
-    if any(keyword.lower() in name.lower() for keyword in star_keywords):
-        if not name.lstrip().startswith("★"):
-            name = f"★ {name}"
-
-    # 5. Додати wear-стан у дужках, якщо був знайдений
-    if wear_found:
-        name = f"{name} ({wear_found})"
-
-    return name
+    return names.normalize(name, star=True)
 
 # =========================
-# CONNECT TO OPEN CHROME
+# STORE
 # =========================
 
-options = Options()
-options.add_experimental_option("debuggerAddress", DEBUGGER_ADDRESS)
-
-driver = webdriver.Chrome(
-    service=Service(ChromeDriverManager().install()),
-    options=options
-)
-
-wait = WebDriverWait(driver, 20)
-actions = ActionChains(driver)
-
-# =========================
-# EXCEL
-# =========================
-
-if os.path.exists(EXCEL_PATH):
-    wb = load_workbook(EXCEL_PATH)
-    ws = wb.active
-    print(f"📘 Відкрито існуючий файл: {EXCEL_PATH}")
-else:
-    wb = Workbook()
-    ws = wb.active
-    ws.append(["steam_market_hash_name", "csgoskins_price"])
-    print(f"🆕 Створено новий файл: {EXCEL_PATH}")
-
-existing_entries = set()
-for row in ws.iter_rows(min_row=2, values_only=True):
-    existing_entries.add(row[0])
+def open_store() -> PriceStore:
+    """Built where it is used, so importing this module creates nothing on disk"""
+    return PriceStore(SITE)
 
 # =========================
-# OPEN MAIN PAGE
+# MAIN PAGE — CASE LINKS
 # =========================
 
-driver.get(BASE_URL)
-
-wait.until(
-    EC.presence_of_all_elements_located(
-        (By.CSS_SELECTOR, "article.ContainersContainer")
-    )
-)
-
-print("🏠 Головна сторінка завантажена")
+# посилання кожного кейса одним викликом, без кліків
+_CASE_LINKS_JS = """
+return Array.from(document.querySelectorAll(arguments[0])).map(card => {
+    const a = card.closest("a[href]") || card.querySelector("a[href]");
+    return a ? a.href : null;
+});
+"""
+
+
+def get_case_urls() -> list[str]:
+    """Case URLs read once from the main page, in its own tab of the debug Chrome"""
+    options = Options()
+    options.add_experimental_option("debuggerAddress", DEBUGGER_ADDRESS)
+
+    driver = driver_factory.chrome(options)
+
+    try:
+        with case_crawler.own_tab(driver, BASE_URL):
+            WebDriverWait(driver, 20).until(
+                EC.presence_of_all_elements_located((By.CSS_SELECTOR, CASE_SELECTOR))
+            )
+            print("🏠 Головна сторінка завантажена")
+
+            urls = driver.execute_script(_CASE_LINKS_JS, CASE_SELECTOR)
+            if all(urls):
+                return urls
+
+            # картки без <a> — один раз клікаємо, щоб дізнатися адресу
+            print("⚠️ Some cases have no link, discovering their URLs by click")
+            for i, url in enumerate(urls):
+                if url:
+                    continue
+                main_url = driver.current_url
+                case = driver.find_elements(By.CSS_SELECTOR, CASE_SELECTOR)[i]
+                ActionChains(driver).move_to_element(case).click().perform()
+                WebDriverWait(driver, 20).until(EC.url_changes(main_url))
+                urls[i] = driver.current_url
+                driver.get(BASE_URL)
+                WebDriverWait(driver, 20).until(
+                    EC.presence_of_all_elements_located((By.CSS_SELECTOR, CASE_SELECTOR))
+                )
+            return urls
+    finally:
+        driver.quit()
 
 # =========================
-# GET CASE COUNT
+# ONE CASE
 # =========================
 
-cases = driver.find_elements(
-    By.CSS_SELECTOR,
-    "article.ContainersContainer"
-)
-total_cases = len(cases)
-
-print(f"🔍 Знайдено кейсів: {total_cases}")
-
-# =========================
-# ITERATE CASES
-# =========================
-def parse_rare_modal():
-    rows = WebDriverWait(driver, 10).until(
-        EC.presence_of_all_elements_located(
-            (By.CSS_SELECTOR, ".ContainerChancesModal_table tbody tr")
+def parse_rare_modal(driver, new_rows):
+    with timing.stage(timing.WAIT):
+        rows = WebDriverWait(driver, 10).until(
+            EC.presence_of_all_elements_located(
+                (By.CSS_SELECTOR, ".ContainerChancesModal_table tbody tr")
+            )
         )
-    )
 
     for r in rows:
         name = r.find_element(
@@ -146,61 +108,36 @@ def parse_rare_modal():
             continue
 
         price = cells[1].text.strip().replace("$", "")
-
-        if name in existing_entries:
-            continue
-
-        ws.append([name, price])
-        existing_entries.add(name)
-        print(f"{name} = {price}")
+        new_rows.append((name, price))
 
     # close modal
     driver.find_element(By.CSS_SELECTOR, ".Modal_close").click()
-    time.sleep(0.6)
-
-for case_index in range(total_cases):
-    print(f"\n➡️ Відкриваю кейс [{case_index + 1}/{total_cases}]")
-
-    # ЗАВЖДИ перевитягуємо кейси (DOM міняється)
-    cases = driver.find_elements(
-        By.CSS_SELECTOR,
-        "article.ContainersContainer"
+    WebDriverWait(driver, 5).until(
+        EC.invisibility_of_element_located((By.CSS_SELECTOR, ".ContainerChancesModal_table"))
     )
-    case = cases[case_index]
 
-    # Людський клік
-    driver.execute_script(
-        "arguments[0].scrollIntoView({block:'center'});", case
-    )
-    time.sleep(0.8)
 
-    actions.move_to_element(case).pause(0.4).click().perform()
+def parse_case(driver, case_url):
+    """(case slug, [(hash_name, price)]) for one case page; runs in a worker tab"""
+    with timing.stage(timing.NAVIGATE):
+        driver.get(case_url)
 
-    # =========================
-    # WAIT CASE PAGE
-    # =========================
-
-    wait.until(
-        EC.presence_of_all_elements_located(
-            (By.CLASS_NAME, "list_item")
+    with timing.stage(timing.WAIT):
+        WebDriverWait(driver, 20).until(
+            EC.presence_of_all_elements_located(
+                (By.CLASS_NAME, "list_item")
+            )
         )
-    )
-    time.sleep(1.5)
-
-    print("📦 Сторінка кейса відкрита")
-
-    # =========================
-    # ====== ТВОЙ СТАРИЙ КОД ======
-    # =========================
+    readiness.wait_for_change(driver, ".list_item")
 
-    list_items = driver.find_elements(By.CLASS_NAME, "list_item")
-    print(f"🔍 Found {len(list_items)} items on page.")
+    # один page_source і один парс на всю сторінку кейса
+    with timing.stage(timing.EXTRACT):
+        html = driver.page_source
+    list_items = html_parse.parse_html(html).select(".list_item")
+    new_rows = []
 
-    for item in list_items:
+    for item_index, soup in enumerate(list_items):
         try:
-            html = item.get_attribute("innerHTML")
-            soup = BeautifulSoup(html, "html.parser")
-
             base_name_tag = soup.select_one(".ContainerGroupedItem_name")
             if not base_name_tag:
                 continue
@@ -211,14 +148,14 @@ for case_index in range(total_cases):
             # =========================
             if "Rare Special Item" in base_name:
                 try:
+                    # для кліку потрібен живий елемент — беремо лише тут
+                    item = driver.find_elements(By.CLASS_NAME, "list_item")[item_index]
                     driver.execute_script(
                         "arguments[0].scrollIntoView({block:'center'});", item
                     )
-                    time.sleep(0.4)
-
-                    actions.move_to_element(item).pause(0.3).click().perform()
+                    ActionChains(driver).move_to_element(item).pause(0.3).click().perform()
 
-                    parse_rare_modal()
+                    parse_rare_modal(driver, new_rows)
                     continue
 
                 except Exception as e:
@@ -247,134 +184,94 @@ for case_index in range(total_cases):
                 if not price_td:
                     continue
 
-                price_text = price_td.text.strip().replace("$", "")
-
-                if full_name in existing_entries:
-                    continue
-
-                ws.append([full_name, price_text])
-                existing_entries.add(full_name)
-
-                print(f"   ✔ {full_name} = {price_text}")
+                new_rows.append((full_name, price_td.text.strip().replace("$", "")))
 
         except Exception as e:
             print(f"❌ Error: {e}")
 
-    wb.save(EXCEL_PATH)
-    print("💾 Кейc збережено")
-
-    # =========================
-    # BACK TO MAIN PAGE
-    # =========================
-
-    driver.back()
-
-    wait.until(
-        EC.presence_of_all_elements_located(
-            (By.CSS_SELECTOR, "article.ContainersContainer")
-        )
-    )
-    time.sleep(1.2)
+    return case_url.rstrip("/").rsplit("/", 1)[-1], new_rows
 
 # =========================
-# DONE
+# ALL CASES
 # =========================
 
-print("\n🎉 ALL CASES DONE")
-driver.quit()
+@timing.traced(SITE)
+def crawl(workers: int = WORKERS, store: PriceStore | None = None):
+    store = store or open_store()
+    existing_entries = store.names()
+    print(f"📘 Сховище цін {store.path}: {len(existing_entries)} айтемів")
 
-def save_distinct_csgoskins():
-    print("🧹 Deduplicating by steam_market_hash_name...")
-    df = pd.read_excel(EXCEL_PATH)
-
-    before = len(df)
-
-    df = (
-        df
-        .dropna(subset=["steam_market_hash_name"])
-        .drop_duplicates(
-            subset=["steam_market_hash_name"],
-            keep="first"
-        )
-    )
+    case_urls = get_case_urls()
+    print(f"🔍 Знайдено кейсів: {len(case_urls)}, парсимо в {workers} вкладках")
 
-    after = len(df)
+    # без повернень на головну: кожна вкладка відкриває кейс за адресою
+    case_crawler.crawl_cases(case_urls, parse_case, store, existing_entries, workers, DEBUGGER_ADDRESS)
 
-    df.to_excel(EXCEL_PATH, index=False)
+    print("\n🎉 ALL CASES DONE")
 
-    print(f"✅ Dedup done: {before} → {after}")
+def prepare(items):
+    """Nothing to build up front, prices come from the crawled store"""
 
+def price_items(items, on_price, crawl_first=True, workers=WORKERS):
+    """Crawl every case into the store, then answer items from it.
 
-def merge_with_problematic():
-    PROBLEMATIC_FILE = "Problematic Withdrawals.xlsx"
+    An item no crawled case drops is reported as None, not "-", so a
+    journal keeps it pending for the next run.
+    """
+    store = open_store()
+    if crawl_first:
+        crawl(workers, store)
 
-    print("🔗 Merging csgoskins_price into Problematic Withdrawals.xlsx ...")
+    store.compact()
+    prices = store.price_map()
+    for item in items:
+        on_price(item, prices.get(item))
 
-    g4_df = pd.read_excel(EXCEL_PATH)
-    g4_df = (
-        g4_df
-        .dropna(subset=["steam_market_hash_name"])
-        .drop_duplicates("steam_market_hash_name", keep="first")
-    )
+def save_distinct_csgoskins(store: PriceStore | None = None):
+    store = store or open_store()
+    print("🧹 Deduplicating by steam_market_hash_name...")
+    before = len(store.read())
 
-    price_map = (
-        g4_df
-        .set_index("steam_market_hash_name")["csgoskins_price"]
-        .to_dict()
-    )
+    store.compact()
+    after = store.export_xlsx(EXCEL_PATH)
 
-    # 2. Всі аркуші Problematic
-    sheets = pd.read_excel(PROBLEMATIC_FILE, sheet_name=None)
-    out_sheets = {}
+    print(f"✅ Dedup done: {before} → {after}, exported to {EXCEL_PATH}")
 
-    for sheet_name, sheet_df in sheets.items():
-        print(f"   🔄 Processing sheet: {sheet_name}")
 
-        if "steam_market_hash_name" not in sheet_df.columns:
-            print("   ⚠️ Skipped (no steam_market_hash_name)")
-            out_sheets[sheet_name] = sheet_df
-            continue
+def merge_with_problematic(store: PriceStore | None = None):
+    store = store or open_store()
+    PROBLEMATIC_FILE = "Problematic Withdrawals.xlsx"
 
-        # 3. overwrite або create
-        sheet_df["csgoskins_price"] = (
-            sheet_df["steam_market_hash_name"]
-            .map(price_map)
-            .fillna("-")
-        )
+    print("🔗 Merging csgoskins_price into Problematic Withdrawals.xlsx ...")
 
-        out_sheets[sheet_name] = sheet_df
+    # 1. Lookup з csgoskins
+    price_map = store.price_map()
 
-    # 4. Запис назад усіх аркушів
-    with pd.ExcelWriter(
-        PROBLEMATIC_FILE,
-        engine="openpyxl",
-        mode="w"
-    ) as writer:
-        for sheet_name, df_out in out_sheets.items():
-            df_out.to_excel(writer, sheet_name=sheet_name, index=False)
+    # 2. Один прохід по всіх аркушах: одне читання, один запис
+    workbook.merge_price_maps(PROBLEMATIC_FILE, {PRICE_COL: (price_map, None)})
 
     print("✅ csgoskins_price overwritten / created in all applicable sheets")
 
-
 def main():
     print("\n=== SELECT ACTION ===")
     print("1. Save distinct csgoskins.xlsx")
     print("2. Merge with Problematic Withdrawals.xlsx")
 
     choice = input("\nEnter choice (1/2): ").strip()
+    store = open_store()
 
     if choice == "1":
-        save_distinct_csgoskins()
+        save_distinct_csgoskins(store)
     elif choice == "2":
         try:
-            merge_with_problematic()
-            if os.path.exists(EXCEL_PATH):
-                os.remove(EXCEL_PATH)
-                print(f"🗑 Removed file: {EXCEL_PATH}")
+            merge_with_problematic(store)
+            store.clear()
+            print(f"🗑 Cleared price store: {store.path}")
         except Exception as e:
             print(f"❌ Merge failed, file not deleted: {e}")
     else:
         print("❌ Invalid choice")
 
 if __name__ == "__main__":
+    crawl()
     main()
\ No newline at end of file
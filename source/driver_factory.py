@@ -0,0 +1,180 @@
+import atexit
+import json
+import os
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from selenium import webdriver
+from selenium.common.exceptions import SessionNotCreatedException
+from selenium.webdriver.chrome.service import Service
+from webdriver_manager.chrome import ChromeDriverManager
+
+# =========================
+# CONFIG
+# =========================
+
+MANIFEST_FILE = "chromedriver_manifest.json"
+# None = keep the cached driver until Chrome refuses it (after a Chrome
+# update); a number of seconds re-checks online that often
+MANIFEST_TTL = None
+
+PREWARM = 1           # drivers started in the background per factory
+PREWARM_THREADS = 4
+
+# =========================
+# CHROMEDRIVER PATH
+# =========================
+
+_lock = threading.Lock()
+_path = None
+
+
+def _load_manifest() -> dict | None:
+    try:
+        with open(MANIFEST_FILE, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    # "path" is the one field a manifest can't do without; see _is_stale for the rest
+    if not isinstance(manifest, dict) or not os.path.exists(manifest.get("path") or ""):
+        return None
+    return manifest
+
+
+def _is_stale(manifest: dict) -> bool:
+    """Older or hand-edited manifests without resolved_at are re-resolved"""
+    resolved_at = manifest.get("resolved_at")
+    if not isinstance(resolved_at, (int, float)):
+        return True
+    return MANIFEST_TTL is not None and time.time() - resolved_at > MANIFEST_TTL
+
+
+def _driver_version(path: str) -> str:
+    try:
+        out = subprocess.run([path, "--version"], capture_output=True, text=True, timeout=10).stdout
+    except (OSError, subprocess.SubprocessError):
+        return ""
+    # "ChromeDriver 124.0.6367.91 (...)"
+    parts = out.split()
+    return parts[1] if len(parts) > 1 else ""
+
+
+def _save_manifest(path: str):
+    manifest = {"path": path, "version": _driver_version(path), "resolved_at": time.time()}
+    with open(MANIFEST_FILE, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    print(f"🧭 chromedriver {manifest['version'] or '?'} cached in {MANIFEST_FILE}")
+
+
+def driver_path(refresh: bool = False) -> str:
+    """chromedriver binary, resolved online once and then read from the manifest.
+
+    refresh=True asks webdriver_manager again (e.g. Chrome was updated).
+    If that fails and a cached driver exists, the cached one is kept, so
+    runs work offline once the manifest is there.
+    """
+    global _path
+
+    with _lock:
+        if _path and not refresh:
+            return _path
+
+        manifest = _load_manifest()
+        stale = manifest and _is_stale(manifest)
+        if manifest and not refresh and not stale:
+            _path = manifest["path"]
+            return _path
+
+        try:
+            path = ChromeDriverManager().install()
+        except Exception as e:
+            if manifest is None:
+                raise
+            print(f"⚠ Can't resolve chromedriver ({e}), using cached {manifest['path']}")
+            _path = manifest["path"]
+            return _path
+
+        _save_manifest(path)
+        _path = path
+        return _path
+
+
+def service() -> Service:
+    return Service(driver_path())
+
+
+def chrome(options) -> webdriver.Chrome:
+    """webdriver.Chrome on the cached chromedriver, re-resolved once on a version mismatch"""
+    try:
+        return webdriver.Chrome(service=service(), options=options)
+    except SessionNotCreatedException:
+        print("♻ Chrome refused the cached chromedriver, resolving it again")
+        driver_path(refresh=True)
+        return webdriver.Chrome(service=service(), options=options)
+
+# =========================
+# PRE-WARM
+# =========================
+
+_warm_lock = threading.Lock()
+_warm = {}  # key → [Future of a driver]
+_executor = None
+
+
+def prewarm(factory, count: int = PREWARM, key=None):
+    """Start `count` drivers from factory() in the background.
+
+    take() with the same factory (or key) hands them out, so the first
+    lookups don't wait for Chrome to start. Whatever is never taken is
+    quit by discard() or at exit.
+    """
+    global _executor
+    key = key or factory
+
+    with _warm_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=PREWARM_THREADS, thread_name_prefix="prewarm")
+        futures = _warm.setdefault(key, [])
+        for _ in range(count):
+            futures.append(_executor.submit(factory))
+
+
+def take(factory, key=None):
+    """A pre-warmed driver if one was started (waiting for it if still starting), else factory()"""
+    key = key or factory
+
+    with _warm_lock:
+        futures = _warm.get(key)
+        future = futures.pop(0) if futures else None
+
+    if future is not None:
+        try:
+            return future.result()
+        except Exception as e:
+            print(f"⚠ Pre-warmed driver failed to start ({e}), starting a new one")
+
+    return factory()
+
+
+def discard(factory=None, key=None):
+    """Quit the pre-warmed drivers nobody took; no arguments = all of them"""
+    with _warm_lock:
+        if factory is None and key is None:
+            futures = [f for fs in _warm.values() for f in fs]
+            _warm.clear()
+        else:
+            futures = _warm.pop(key or factory, [])
+
+    for future in futures:
+        if future.cancel():
+            continue
+        try:
+            future.result().quit()
+        except Exception:
+            pass
+
+
+atexit.register(discard)
@@ -0,0 +1,192 @@
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.chrome.options import Options
+from selenium.common.exceptions import WebDriverException
+
+import driver_factory
+
+# =========================
+# CONFIG
+# =========================
+
+POOL_SIZE = os.cpu_count() or 1
+MAX_RETRIES = 2
+
+# =========================
+# DRIVER FACTORY
+# =========================
+
+def make_headless_driver(service_path: str) -> webdriver.Chrome:
+    """Start one headless Chrome with the same flags the parsers use"""
+    options = Options()
+    options.add_argument("--headless")
+    options.add_argument("--disable-blink-features=AutomationControlled")
+
+    return webdriver.Chrome(service=Service(service_path), options=options)
+
+
+def is_alive(driver) -> bool:
+    try:
+        driver.current_url
+        return True
+    except Exception:
+        return False
+
+# =========================
+# POOL
+# =========================
+
+class DriverPool:
+    """N reusable Chrome drivers that lookups are fanned out over.
+
+    Drivers are started lazily, handed back to the pool after every item and
+    replaced when they crash. `map` keeps the order of the input list.
+    teardown(driver), if given, runs before every quit (e.g. to close a tab
+    opened in a shared Chrome). prewarm starts that many drivers in the
+    background right away, while the caller is still doing other work;
+    prewarm() does the same later, once drivers are known to be needed.
+    """
+
+    def __init__(self, size: int | None = None, factory=make_headless_driver, teardown=None,
+                 prewarm: int = 0):
+        self.size = size or POOL_SIZE
+        self.factory = factory
+        self.teardown = teardown
+
+        self._idle = queue.Queue()
+        self._drivers = []
+        self._starting = 0  # slots reserved by acquire() for a driver being started
+        self._lock = threading.Lock()
+        self._closed = False
+
+        if prewarm:
+            self.prewarm(prewarm)
+
+    # ----- driver lifecycle -----
+
+    def _make(self):
+        # chromedriver comes from the cached manifest, not a fresh install(),
+        # and only once a driver is started, so pure HTTP runs stay offline
+        return self.factory(driver_factory.driver_path())
+
+    def prewarm(self, count: int = driver_factory.PREWARM):
+        """Start up to count drivers in the background"""
+        driver_factory.prewarm(self._make, min(count, self.size), key=self)
+
+    def _start(self):
+        driver = driver_factory.take(self._make, key=self)
+        with self._lock:
+            self._drivers.append(driver)
+        return driver
+
+    def acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        # check and reserve under one lock, or parallel callers overshoot size
+        with self._lock:
+            can_start = len(self._drivers) + self._starting < self.size
+            if can_start:
+                self._starting += 1
+        if can_start:
+            try:
+                return self._start()
+            finally:
+                with self._lock:
+                    self._starting -= 1
+
+        return self._idle.get()
+
+    def release(self, driver):
+        if self._closed:
+            return
+        self._idle.put(driver)
+
+    def _quit(self, driver):
+        if self.teardown:
+            try:
+                self.teardown(driver)
+            except Exception:
+                pass
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def discard(self, driver):
+        with self._lock:
+            if driver in self._drivers:
+                self._drivers.remove(driver)
+        self._quit(driver)
+
+    def close(self):
+        self._closed = True
+        driver_factory.discard(key=self)
+        with self._lock:
+            drivers, self._drivers = self._drivers, []
+        for driver in drivers:
+            self._quit(driver)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ----- work -----
+
+    def run(self, fn, item):
+        """Call fn(driver, item), retrying on a fresh driver if Chrome died"""
+        for attempt in range(MAX_RETRIES + 1):
+            if self._closed:
+                return None
+
+            driver = self.acquire()
+            try:
+                result = fn(driver, item)
+            except WebDriverException:
+                self.discard(driver)
+                continue
+
+            # get_*price swallow errors and return None, so a crashed
+            # driver looks like "no price" — check before trusting it
+            if result is None and not is_alive(driver):
+                print(f"♻ Driver crashed on {item}, replacing (attempt {attempt + 1})")
+                self.discard(driver)
+                continue
+
+            self.release(driver)
+            return result
+
+        return None
+
+    def map(self, fn, items, on_result=None) -> list:
+        """Run fn(driver, item) for every item, results in input order.
+
+        on_result(index, item, result) is called from the caller's thread as
+        soon as each item finishes, so progress can be printed live.
+        """
+        results = [None] * len(items)
+        executor = ThreadPoolExecutor(max_workers=self.size)
+
+        try:
+            futures = {
+                executor.submit(self.run, fn, item): i
+                for i, item in enumerate(items)
+            }
+            for future in as_completed(futures):
+                i = futures[future]
+                results[i] = future.result()
+                if on_result:
+                    on_result(i, items[i], results[i])
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        return results
@@ -1,19 +1,28 @@
 import re
 import os
 import time
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
-from bs4 import BeautifulSoup
 import pandas as pd
 
+import async_fetch
+import checkpoint
+import driver_factory
+import html_parse
+import http_fetch
+import price_cache
+import slugs
+import timing
+import workbook
+
 EXCEL_FILE = "Problematic Withdrawals.xlsx"
 ITEM_COL = "steam_market_hash_name"
+SITE = "farmskins"
 PRICE_COL = "farmskins_price"
+BASE_URL = "https://farmskins.com/items/"
+FETCH_ENGINE = "async"  # "async", "http" or "selenium"
 
 # =========================
 # URL + PRICE HELPERS
@@ -54,6 +63,22 @@ def format_skin_url(skin_name):
     return url
 
 
+def format_skin_slugs(names: pd.Series) -> pd.Series:
+    """Vectorized format_skin_url for weapon names; NaN for stickers / odd names"""
+    clean = (
+        names.str.replace("★ ", "", regex=False)
+        .str.replace("StatTrak™", "", regex=False)
+        .str.strip()
+    )
+    parts = clean.str.split(" | ", regex=False)
+    weapon = parts.str[0].str.strip().str.replace(" ", "-", regex=False)
+    name = parts.str[1].str.split(" (", regex=False).str[0].str.strip().str.replace(" ", "-", regex=False)
+
+    slug = (weapon + "-" + name).str.lower()
+    return slug.where(~clean.str.startswith("Sticker") & clean.str.contains(" | ", regex=False))
+
+
+@timing.timed(timing.PRICE_PARSE)
 def extract_price_number(price: str | None):
     if not price or not isinstance(price, str):
         return None
@@ -75,18 +100,15 @@ def extract_price_number(price: str | None):
 # SCRAPER
 # =========================
 
-def get_skin_price(driver, skin_name):
-    url = f"https://farmskins.com/items/{format_skin_url(skin_name)}"
-    driver.get(url)
-
-    try:
-        WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.CLASS_NAME, "item-statistics__row"))
-        )
-    except Exception:
+def product_url(skin_name):
+    slug = slugs.slug_for(SITE, skin_name, format_skin_url)
+    if slug is None:
         return None
+    return f"{BASE_URL}{slug}"
 
-    soup = BeautifulSoup(driver.page_source, "html.parser")
+
+def parse_price_html(html, skin_name):
+    soup = html_parse.parse_html(html)
 
     # 🟣 Якщо це стікер
     if skin_name.strip().startswith("Sticker"):
@@ -118,6 +140,57 @@ def get_skin_price(driver, skin_name):
     return None
 
 
+def price_from_response(skin_name, status, final_url, html):
+    """Shared by the HTTP and asyncio engines, raises NeedsBrowser if the stats table is missing"""
+    html = http_fetch.check_response(status, html, final_url)
+    if html is None:
+        return price_cache.NOT_FOUND
+
+    if "item-statistics__row" not in html:
+        raise http_fetch.NeedsBrowser(skin_name)
+
+    # the stats table is there, just not this item / quality
+    price = parse_price_html(html, skin_name)
+    return price_cache.NOT_FOUND if price is None else price
+
+
+def fetch_skin_price(skin_name):
+    """Plain HTTP path: no browser"""
+    url = product_url(skin_name)
+    if url is None:
+        return price_cache.NOT_FOUND
+
+    status, html = http_fetch.fetch(url)
+    return price_from_response(skin_name, status, url, html)
+
+
+@price_cache.cached(SITE, precheck=price_cache.not_a_skin)
+def get_skin_price(driver, skin_name):
+    # driver=None → HTTP engine, Selenium is only the fallback
+    if driver is None:
+        return fetch_skin_price(skin_name)
+
+    url = product_url(skin_name)
+    if url is None:
+        return price_cache.NOT_FOUND
+    with timing.stage(timing.NAVIGATE):
+        driver.get(url)
+
+    try:
+        with timing.stage(timing.WAIT):
+            WebDriverWait(driver, 10).until(
+                EC.presence_of_element_located((By.CLASS_NAME, "item-statistics__row"))
+            )
+    except Exception:
+        return None
+
+    with timing.stage(timing.EXTRACT):
+        html = driver.page_source
+
+    price = parse_price_html(html, skin_name)
+    return price_cache.NOT_FOUND if price is None else price
+
+
 # =========================
 # EXCEL WORKFLOW
 # =========================
@@ -135,72 +208,102 @@ def choose_sheets(xls: pd.ExcelFile) -> list[str]:
     idx = int(choice) - 1
     return [xls.sheet_names[idx]]
 
-def process_sheets(sheet_names: list[str]):
+def make_driver():
     options = Options()
     options.add_argument("--headless=new")
     options.add_argument("--disable-blink-features=AutomationControlled")
 
-    driver = webdriver.Chrome(
-        service=Service(ChromeDriverManager().install()),
-        options=options
-    )
+    return driver_factory.chrome(options)
 
-    xls = pd.ExcelFile(EXCEL_FILE)
-    writer = None
-    wrote_anything = False
 
-    try:
-        writer = pd.ExcelWriter(
-        EXCEL_FILE,
-        engine="openpyxl",
-        mode="a",
-        if_sheet_exists="replace"
-    )
+def prepare(items):
+    """Once per run, before any lookups (also before worker processes start)"""
+    slugs.build_index(SITE, items, format_skin_url, format_skin_slugs)
 
-        total_sheets = len(sheet_names)
-        selected_index = 0
 
-        for sheet in xls.sheet_names:
-            df = pd.read_excel(xls, sheet_name=sheet)
+def price_items(items, on_price, engine=FETCH_ENGINE):
+    """Every lookup pass over items; on_price(item, price or None) per item"""
+    def report(item, raw_price):
+        if raw_price is None or raw_price == price_cache.NOT_FOUND:
+            on_price(item, raw_price)
+        else:
+            on_price(item, extract_price_number(raw_price))
 
-            if sheet in sheet_names and ITEM_COL in df.columns:
-                selected_index += 1
-                print(f"\n=== Processing sheet: {sheet} ===")
+    driver = None
 
-                items = df[ITEM_COL].astype(str).tolist()
-                prices = []
-                success = 0
+    def warm():
+        # the first page that needs the browser: Chrome starts while the rest is fetched
+        driver_factory.prewarm(make_driver)
 
-                for i, item in enumerate(items, start=1):
-                    raw_price = get_skin_price(driver, item)
-                    price_number = extract_price_number(raw_price)
-                    prices.append(price_number if price_number is not None else "-")
+    try:
+        browser_items = items
+        if engine == "async":
+            browser_items = async_fetch.run_lookups(
+                items, product_url, price_from_response, report, site=SITE, on_needs_browser=warm
+            )
+        elif engine == "http":
+            _, browser_items = http_fetch.price_items(
+                get_skin_price, items, on_result=report, on_needs_browser=warm
+            )
+
+        if browser_items:
+            # Chrome стартує тільки якщо HTTP не впорався
+            print(f"\n🌐 {len(browser_items)} items need the browser")
+            driver = driver_factory.take(make_driver)
+            for item in browser_items:
+                report(item, get_skin_price(driver, item))
 
-                    if price_number is not None:
-                        success += 1
+    finally:
+        driver_factory.discard(make_driver)
+        if driver:
+            driver.quit()
+
+
+@timing.traced(SITE)
+def process_sheets(sheet_names: list[str], engine=FETCH_ENGINE, write=True):
+    xls = pd.ExcelFile(EXCEL_FILE)
+    frames = workbook.read_sheets(xls, sheet_names)
+    items = workbook.plan_items(frames, sheet_names, ITEM_COL)
+
+    price_map = checkpoint.PriceJournal(SITE, EXCEL_FILE, frames, sheet_names, ITEM_COL)
+    items = price_map.pending(items)
+    prepare(items)
+    success = 0
+    done = 0
 
-                    print(
-                        f"[{selected_index}/{total_sheets}] "
-                        f"[{i}/{len(items)}] "
-                        f"{item} → {price_number}"
-                    )
+    def report(item, price_number):
+        nonlocal success, done
+        done += 1
+        if price_number is None:
+            price_map.fail(item)
+        else:
+            price_map[item] = price_number
 
-                df[PRICE_COL] = prices
-                wrote_anything = True
-                
-                print(f"✔ Sheet done: {success}/{len(items)} prices found")
+        if price_number not in (None, price_cache.NOT_FOUND):
+            success += 1
 
-            df.to_excel(writer, sheet_name=sheet, index=False)
+        print(f"[{done}/{len(items)}] {item} → {price_number}")
+
+    try:
+        price_items(items, report, engine)
+        print(f"✔ Done: {success}/{len(items)} prices found")
 
     except KeyboardInterrupt:
         print("\n⚠ Interrupted by user. Processing stopped.")
-        driver.quit()
+        print(f"💾 Progress kept in {price_map.path}, re-run to resume")
         return
 
     finally:
-        driver.quit()
-    if wrote_anything:
-        writer.close()
+        price_map.close()
+
+    # merge.py writes every site in one pass
+    if not write:
+        price_map.mark_complete()
+        print(f"📒 Prices kept in {price_map.path} for merge.py")
+        return
+
+    workbook.write_prices(EXCEL_FILE, sheet_names, PRICE_COL, price_map.with_failed(), ITEM_COL)
+    price_map.finish()
 
 # =========================
 # ENTRYPOINT
@@ -1,142 +1,105 @@
-from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
-from webdriver_manager.chrome import ChromeDriverManager
-from bs4 import BeautifulSoup
-from openpyxl import Workbook, load_workbook
-import time
-import os
-import pandas as pd
-import re
+import case_crawler
+import driver_factory
+import html_parse
+import names
+import readiness
+import timing
+import workbook
+from price_store import PriceStore
 
 # =========================
 # CONFIG
 # =========================
 
 DEBUGGER_ADDRESS = "127.0.0.1:9222"
+BASE_URL = "https://g4skins.com"
 EXCEL_PATH = "g4skins.xlsx"
+SITE = "g4skins"
+PRICE_COL = "g4skins_price"
+WORKERS = case_crawler.WORKERS
+HOVER_ROWS_SELECTOR = ".content-hover tbody tr"
 
 QUALITIES = {"BS", "WW", "FT", "MW", "FN"}
 
-wear_map = {
-    "FN": "Factory New",
-    "MW": "Minimal Wear",
-    "FT": "Field-Tested",
-    "WW": "Well-Worn",
-    "BS": "Battle-Scarred"
-}
-
 def clean_name(name: str) -> str:
-    if not isinstance(name, str):
-        return name
-
-    name = re.sub(r"\s+", " ", name.strip())
-
-    wear_found = None
-    for short, full in wear_map.items():
-        pattern = rf"(?:\(\s*{short}\s*\)|\b{short}\b)"
-        if re.search(pattern, name):
-            wear_found = full
-            name = re.sub(pattern, "", name).strip()
-            break
-
-    if re.search(r"\bST\b", name):
-        name = re.sub(r"\bST\b", "", name).strip()
-        name = f"StatTrak™ {name}"
-
-    if wear_found:
-        name = f"{name} ({wear_found})"
-
-    return name
-
-# =========================
-# CONNECT TO OPEN CHROME
-# =========================
-
-options = Options()
-options.add_experimental_option("debuggerAddress", DEBUGGER_ADDRESS)
-
-driver = webdriver.Chrome(
-    service=Service(ChromeDriverManager().install()),
-    options=options
-)
-
-wait = WebDriverWait(driver, 15)
-actions = ActionChains(driver)
+    return names.normalize(name)
 
 # =========================
-# EXCEL
+# STORE
 # =========================
 
-if os.path.exists(EXCEL_PATH):
-    wb = load_workbook(EXCEL_PATH)
-    ws = wb.active
-    print(f"📘 Opened existing file: {EXCEL_PATH}")
-else:
-    wb = Workbook()
-    ws = wb.active
-    ws.append(["steam_market_hash_name", "g4skins_price"])
-    print(f"🆕 Created new file: {EXCEL_PATH}")
-
-existing = set()
-for r in ws.iter_rows(min_row=2, values_only=True):
-    existing.add(r[0])
+def open_store() -> PriceStore:
+    """Built where it is used, so importing this module creates nothing on disk"""
+    return PriceStore(SITE)
 
 # =========================
 # MAIN PAGE — GET CASES
 # =========================
 
-wait.until(
-    EC.presence_of_all_elements_located((By.CSS_SELECTOR, "a.g_case.CaseBox"))
-)
+def get_case_urls() -> list[str]:
+    """Case links from the main page, opened in its own tab of the debug Chrome"""
+    options = Options()
+    options.add_experimental_option("debuggerAddress", DEBUGGER_ADDRESS)
 
-case_links = driver.find_elements(By.CSS_SELECTOR, "a.g_case.CaseBox")
-case_urls = [c.get_attribute("href") for c in case_links]
+    driver = driver_factory.chrome(options)
 
-print(f"🔍 Found {len(case_urls)} cases")
+    try:
+        with case_crawler.own_tab(driver, BASE_URL):
+            WebDriverWait(driver, 15).until(
+                EC.presence_of_all_elements_located((By.CSS_SELECTOR, "a.g_case.CaseBox"))
+            )
+            case_links = driver.find_elements(By.CSS_SELECTOR, "a.g_case.CaseBox")
+            return [c.get_attribute("href") for c in case_links]
+    finally:
+        driver.quit()
 
 # =========================
-# PROCESS EACH CASE
+# ONE CASE
 # =========================
 
-for idx, case_url in enumerate(case_urls, start=1):
-    print(f"\n➡️ [{idx}] Opening case: {case_url}")
-    driver.get(case_url)
+def parse_case(driver, case_url):
+    """(case name, [(hash_name, price)]) for one case page; runs in a worker tab"""
+    with timing.stage(timing.NAVIGATE):
+        driver.get(case_url)
 
     # ----- wait items -----
-    wait.until(
-        EC.presence_of_all_elements_located((By.CSS_SELECTOR, ".list-item"))
-    )
+    with timing.stage(timing.WAIT):
+        WebDriverWait(driver, 15).until(
+            EC.presence_of_all_elements_located((By.CSS_SELECTOR, ".list-item"))
+        )
 
     # ----- case name -----
     case_name = driver.find_element(By.CSS_SELECTOR, "h1").text.strip()
-    print(f"📦 Case: {case_name}")
 
     items = driver.find_elements(By.CSS_SELECTOR, ".list-item")
 
     if not items:
-        print("⚠️ No items found, skipping case")
-        continue
+        print(f"⚠️ No items found in {case_name}, skipping case")
+        return case_name, []
 
     # ----- ONE HOVER (hydration) -----
     first_item = items[0]
     driver.execute_script(
         "arguments[0].scrollIntoView({block:'center'});", first_item
     )
-    time.sleep(0.6)
 
+    before = readiness.snapshot(driver, HOVER_ROWS_SELECTOR)
     hover_target = first_item.find_element(By.CSS_SELECTOR, ".content-image")
-    actions.move_to_element(hover_target).pause(1.2).perform()
-    time.sleep(2.0)
+    ActionChains(driver).move_to_element(hover_target).perform()
+    readiness.wait_for_change(driver, HOVER_ROWS_SELECTOR, before)
 
     # ----- PARSE VIA BEAUTIFULSOUP -----
-    soup = BeautifulSoup(driver.page_source, "html.parser")
+    with timing.stage(timing.EXTRACT):
+        html = driver.page_source
+    soup = html_parse.parse_html(html)
     soup_items = soup.select(".list-item")
+    rows_found = []
 
     for item in soup_items:
         weapon_el = item.select_one(
@@ -168,96 +131,67 @@ for idx, case_url in enumerate(case_urls, start=1):
                 continue
 
             raw_name  = f"{weapon} | {skin} ({quality})"
-            full_name = clean_name(raw_name)
-            key = full_name
-
-            if key in existing:
-                continue
-
-            ws.append([full_name, price])
-            existing.add(key)
+            rows_found.append((clean_name(raw_name), price))
 
-            print(f"   ✔ {full_name} = {price}")
-
-    wb.save(EXCEL_PATH)
-    print(f"💾 Saved case: {case_name}")
+    return case_name, rows_found
 
 # =========================
-# DONE
+# ALL CASES
 # =========================
 
-print("\n🎉 ALL CASES DONE")
-driver.quit()
+@timing.traced(SITE)
+def crawl(workers: int = WORKERS, store: PriceStore | None = None):
+    store = store or open_store()
+    existing = store.names()
+    print(f"📘 Price store {store.path}: {len(existing)} items")
 
-def save_distinct_g4skins():
-    print("🧹 Deduplicating by steam_market_hash_name...")
-    df = pd.read_excel(EXCEL_PATH)
+    case_urls = get_case_urls()
+    print(f"🔍 Found {len(case_urls)} cases, crawling in {workers} tabs")
 
-    before = len(df)
+    # кожна вкладка парсить свій кейс, пише в store лише головний потік
+    case_crawler.crawl_cases(case_urls, parse_case, store, existing, workers, DEBUGGER_ADDRESS)
 
-    df = (
-        df
-        .dropna(subset=["steam_market_hash_name"])
-        .drop_duplicates(
-            subset=["steam_market_hash_name"],
-            keep="first"
-        )
-    )
+    print("\n🎉 ALL CASES DONE")
 
-    after = len(df)
+def prepare(items):
+    """Nothing to build up front, prices come from the crawled store"""
 
-    df.to_excel(EXCEL_PATH, index=False)
+def price_items(items, on_price, crawl_first=True, workers=WORKERS):
+    """Crawl every case into the store, then answer items from it.
 
-    print(f"✅ Dedup done: {before} → {after}")
+    An item no crawled case drops is reported as None, not "-", so a
+    journal keeps it pending for the next run.
+    """
+    store = open_store()
+    if crawl_first:
+        crawl(workers, store)
 
-def merge_with_problematic():
-    PROBLEMATIC_FILE = "Problematic Withdrawals.xlsx"
+    store.compact()
+    prices = store.price_map()
+    for item in items:
+        on_price(item, prices.get(item))
 
-    print("🔗 Merging g4skins_price into Problematic Withdrawals.xlsx ...")
-
-    # 1. Lookup з g4skins
-    g4_df = pd.read_excel(EXCEL_PATH)
-    g4_df = (
-        g4_df
-        .dropna(subset=["steam_market_hash_name"])
-        .drop_duplicates("steam_market_hash_name", keep="first")
-    )
-
-    price_map = (
-        g4_df
-        .set_index("steam_market_hash_name")["g4skins_price"]
-        .to_dict()
-    )
+def save_distinct_g4skins(store: PriceStore | None = None):
+    store = store or open_store()
+    print("🧹 Deduplicating by steam_market_hash_name...")
+    before = len(store.read())
 
-    # 2. Всі аркуші Problematic
-    sheets = pd.read_excel(PROBLEMATIC_FILE, sheet_name=None)
-    out_sheets = {}
+    store.compact()
+    after = store.export_xlsx(EXCEL_PATH)
 
-    for sheet_name, sheet_df in sheets.items():
-        print(f"   🔄 Processing sheet: {sheet_name}")
+    print(f"✅ Dedup done: {before} → {after}, exported to {EXCEL_PATH}")
 
-        if "steam_market_hash_name" not in sheet_df.columns:
-            print("   ⚠️ Skipped (no steam_market_hash_name)")
-            out_sheets[sheet_name] = sheet_df
-            continue
+def merge_with_problematic(store: PriceStore | None = None):
+    store = store or open_store()
+    PROBLEMATIC_FILE = "Problematic Withdrawals.xlsx"
 
-        # 3. overwrite або create
-        sheet_df["g4skins_price"] = (
-            sheet_df["steam_market_hash_name"]
-            .map(price_map)
-            .fillna("-")
-        )
+    print("🔗 Merging g4skins_price into Problematic Withdrawals.xlsx ...")
 
-        out_sheets[sheet_name] = sheet_df
+    # 1. Lookup з g4skins
+    price_map = store.price_map()
 
-    # 4. Запис назад усіх аркушів
-    with pd.ExcelWriter(
-        PROBLEMATIC_FILE,
-        engine="openpyxl",
-        mode="w"
-    ) as writer:
-        for sheet_name, df_out in out_sheets.items():
-            df_out.to_excel(writer, sheet_name=sheet_name, index=False)
+    # 2. Один прохід по всіх аркушах: одне читання, один запис
+    workbook.merge_price_maps(PROBLEMATIC_FILE, {PRICE_COL: (price_map, None)})
 
     print("✅ g4skins_price overwritten / created in all applicable sheets")
 
@@ -267,21 +201,22 @@ def main():
     print("2. Merge with Problematic Withdrawals.xlsx")
 
     choice = input("\nEnter choice (1/2): ").strip()
+    store = open_store()
 
     if choice == "1":
-        save_distinct_g4skins()
+        save_distinct_g4skins(store)
     elif choice == "2":
         try:
-            merge_with_problematic()
-            if os.path.exists(EXCEL_PATH):
-                os.remove(EXCEL_PATH)
-                print(f"🗑 Removed file: {EXCEL_PATH}")
+            merge_with_problematic(store)
+            store.clear()
+            print(f"🗑 Cleared price store: {store.path}")
         except Exception as e:
             print(f"❌ Merge failed, file not deleted: {e}")
     else:
         print("❌ Invalid choice")
 
 if __name__ == "__main__":
+    crawl()
     main()
 
 # run:
@@ -1,29 +1,67 @@
 import os
-import time
-from bs4 import BeautifulSoup
 import pandas as pd
-from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
+from selenium.common.exceptions import NoSuchElementException
+
+import catalog
+import checkpoint
+import driver_factory
+import html_parse
+import network_capture
+import price_cache
+import readiness
+import timing
+import workbook
 
 EXCEL_FILE = "Problematic Withdrawals.xlsx"
 ITEM_COL = "steam_market_hash_name"
+SITE = "ggdrop"
 PRICE_COL = "ggdrop_price"
+RESULT_SELECTOR = ".item_price__aCda4"
+
+# ціни беремо з JSON, який сторінка тягне через XHR, DOM — лише запасний варіант
+# off until the endpoint and API_PRICE_SCALE are checked against a real payload
+CAPTURE_JSON = False
+API_URL_PART = "ggdrop.com/api/"
+API_PRICE_SCALE = 1  # 100 if the API turns out to send cents
+
+# один прохід по всьому гріду замість пошуку на кожен рядок
+SNAPSHOT = True
+GRID_SELECTOR = ".items_items__x8V9i"
+CARD_SELECTOR = ".items_items__x8V9i > *"
+CARD_NAME_SELECTOR = "[class*='item_name']"
+
+@price_cache.cached(SITE, precheck=price_cache.not_a_skin)
+def get_price(driver, name_input, query, capture=None, index=None):
+    # наліпки/кейси тут не продаються — навіть не вводимо
+    if not "|" in query:
+        return price_cache.NOT_FOUND
+
+    # in the catalog snapshot taken at the start of the run
+    snapped = index.get(query) if index else None
+    if snapped is not None:
+        return snapped
+
+    # already in a payload captured for an earlier search / the catalog
+    captured = capture.lookup(query) if capture else None
+    if captured is not None:
+        return captured
+
+    before = readiness.snapshot(driver, RESULT_SELECTOR)
 
-def get_price(driver, name_input, query):
     name_input.click()
     name_input.send_keys(Keys.CONTROL + "a")
     name_input.send_keys(Keys.BACKSPACE) 
     # вводимо назву скіна
     name_input.send_keys(query)
     name_input.send_keys(Keys.ENTER)
-    time.sleep(2)
+    readiness.wait_for_change(driver, RESULT_SELECTOR, before)
 
-    if not "|" in query:
-            return None
+    captured = capture.lookup(query) if capture else None
+    if captured is not None:
+        return captured
 
     is_stattrak = "stattrak" in query.lower()
 
@@ -32,27 +70,52 @@ def get_price(driver, name_input, query):
             # непосрєдствєнно прайс
             price_el = driver.find_element(By.CLASS_NAME, "item_price__aCda4")
             return price_el.text.strip()
+        except NoSuchElementException:
+            # the search came back empty
+            return price_cache.NOT_FOUND
         except:
             return None
     else:
         # Проходимо по всіх айтемах, шукаємо перший без "StatTrak"
         try:
             # грід зі скінами
-            items = driver.find_elements(By.CLASS_NAME, "items_items__x8V9i")
-            html = items[0].get_attribute('outerHTML')
-            soup = BeautifulSoup(html, 'html.parser')
-            prices = soup.find_all('div', class_='item_price__aCda4')
+            grids = html_parse.select_on_page(driver, ".items_items__x8V9i")
+            prices = grids[0].find_all('div', class_='item_price__aCda4')
             if len(prices) == 1:
-                price_el = driver.find_element(By.CLASS_NAME, "item_price__aCda4")
-                return price_el.text.strip()
+                return prices[0].text.strip()
             if len(prices) >= 2:
                 second_price = prices[1].text
                 return second_price.strip()
             else:
-                return None
+                # the grid loaded without a single item
+                return price_cache.NOT_FOUND
         except:
             return None
 
+def card_name(card) -> str | None:
+    name_el = card.select_one(CARD_NAME_SELECTOR)
+    if name_el and "|" in name_el.get_text():
+        return name_el.get_text(" ", strip=True)
+
+    img = card.find("img")
+    if img and img.get("alt"):
+        return img["alt"].strip()
+
+    return None
+
+
+def parse_card(card):
+    price_el = card.select_one(RESULT_SELECTOR)
+    if price_el is None:
+        return None
+    return card_name(card), price_el.text.strip(), "StatTrak" in card.get_text(" "), False
+
+
+def snapshot_catalog(driver, capture=None) -> catalog.CatalogIndex:
+    """Scroll the /items grid to the end once and index every card"""
+    return catalog.crawl_grid(driver, catalog.CatalogIndex(SITE), CARD_SELECTOR, parse_card, capture=capture)
+
+
 def choose_sheets(xls: pd.ExcelFile) -> list[str]:
     print("\nFound sheets:")
     for i, name in enumerate(xls.sheet_names, start=1):
@@ -64,72 +127,104 @@ def choose_sheets(xls: pd.ExcelFile) -> list[str]:
 
     return [xls.sheet_names[int(choice) - 1]]
 
-def process_sheets(sheet_names: list[str]):
+@timing.timed(timing.PRICE_PARSE)
+def to_price(raw):
+    if raw is None or raw == price_cache.NOT_FOUND or isinstance(raw, float):
+        return raw
+    try:
+        return float(raw[:-1].replace(" ", ""))
+    except ValueError:
+        return None
+
+
+def prepare(items):
+    """Nothing to build up front, prices come from the /items grid"""
+
+
+def make_driver():
     options = Options()
     options.add_argument("--headless=new")
+    if CAPTURE_JSON:
+        network_capture.enable_capture(options)
 
-    driver = webdriver.Chrome(
-        service=Service(ChromeDriverManager().install()),
-        options=options)
+    return driver_factory.chrome(options)
 
-    driver.get("https://ggdrop.com/items")
-    driver.implicitly_wait(10)
-    time.sleep(2)
 
-    name_input = driver.find_element(By.CSS_SELECTOR, 'input[placeholder="Name"]')
-
-    xls = pd.ExcelFile(EXCEL_FILE)
-    writer = pd.ExcelWriter(
-        EXCEL_FILE,
-        engine="openpyxl",
-        mode="a",
-        if_sheet_exists="replace"
-    )
+def price_items(items, on_price):
+    """Every lookup pass over items; on_price(item, price or None) per item"""
+    driver = driver_factory.take(make_driver)
 
     try:
-        total = len(sheet_names)
-        sheet_idx = 0
+        # enabled before the first load so the initial catalog request is seen too
+        capture = None
+        if CAPTURE_JSON:
+            capture = network_capture.NetworkCapture(driver, API_URL_PART, API_PRICE_SCALE)
 
-        for sheet in xls.sheet_names:
-            df = pd.read_excel(xls, sheet_name=sheet)
+        with timing.stage(timing.NAVIGATE):
+            driver.get("https://ggdrop.com/items")
+        driver.implicitly_wait(10)
+        readiness.wait_for_change(driver, RESULT_SELECTOR)
 
-            if sheet in sheet_names and ITEM_COL in df.columns:
-                sheet_idx += 1
-                print(f"\n=== Processing sheet {sheet_idx}/{total}: {sheet} ===")
+        name_input = driver.find_element(By.CSS_SELECTOR, 'input[placeholder="Name"]')
 
-                prices = []
-                items = df[ITEM_COL].astype(str).tolist()
+        # per item: price cache, then this snapshot (hits are cached too), then a search
+        # for what the snapshot missed (lazy-loaded, layout changed…)
+        index = snapshot_catalog(driver, capture) if SNAPSHOT else None
 
-                for i, item in enumerate(items, start=1):
-                    raw_price = get_price(driver, name_input, item)
+        for item in items:
+            raw_price = get_price(driver, name_input, item, capture=capture, index=index)
+            on_price(item, to_price(raw_price))
 
-                    if raw_price is None:
-                        prices.append("-")
-                        print(f"[{i}/{len(items)}] No price found for {item}")
-                        continue
+    finally:
+        driver.quit()
 
-                    try:
-                        price = float(raw_price[:-1].replace(" ", ""))
-                        prices.append(price)
-                        print(f"[{i}/{len(items)}] {item}: {price}")
-                    except:
-                        prices.append("-")
-                        print(f"[{i}/{len(items)}] No price found for {item}")
 
-                df[PRICE_COL] = prices
+@timing.traced(SITE)
+def process_sheets(sheet_names: list[str], write=True):
+    # Chrome starts while the workbook is read
+    driver_factory.prewarm(make_driver)
 
-            df.to_excel(writer, sheet_name=sheet, index=False)
+    xls = pd.ExcelFile(EXCEL_FILE)
+    frames = workbook.read_sheets(xls, sheet_names)
+    items = workbook.plan_items(frames, sheet_names, ITEM_COL)
+
+    price_map = checkpoint.PriceJournal(SITE, EXCEL_FILE, frames, sheet_names, ITEM_COL)
+    items = price_map.pending(items)
+    done = 0
+
+    def report(item, price):
+        nonlocal done
+        done += 1
+        if price is None:
+            price_map.fail(item)
+            print(f"[{done}/{len(items)}] Lookup failed for {item}")
+        else:
+            price_map[item] = price
+            print(f"[{done}/{len(items)}] {item}: {price}")
+
+    try:
+        if items:
+            price_items(items, report)
+        else:
+            # everything resumed from the journal, the pre-warmed Chrome isn't needed
+            driver_factory.discard(make_driver)
 
     except KeyboardInterrupt:
         print("\n⚠ Interrupted by user. Processing stopped.")
-        driver.quit()
-        writer.close()
+        print(f"💾 Progress kept in {price_map.path}, re-run to resume")
         return
 
     finally:
-        driver.quit()
+        price_map.close()
+
+    # merge.py writes every site in one pass
+    if not write:
+        price_map.mark_complete()
+        print(f"📒 Prices kept in {price_map.path} for merge.py")
+        return
 
-    writer.close()
+    workbook.write_prices(EXCEL_FILE, sheet_names, PRICE_COL, price_map.with_failed(), ITEM_COL)
+    price_map.finish()
 
 
 # =========================
@@ -0,0 +1,43 @@
+from bs4 import BeautifulSoup, Tag
+
+import timing
+
+# =========================
+# CONFIG
+# =========================
+
+# lxml is C-backed and several times faster than "html.parser"
+PARSER = "lxml"
+
+_FRAGMENT_JS = """
+return Array.from(document.querySelectorAll(arguments[0]))
+    .map(el => el.outerHTML)
+    .join("");
+"""
+
+# =========================
+# PARSING
+# =========================
+
+def parse_html(html: str) -> BeautifulSoup:
+    with timing.stage(timing.SOUP_PARSE):
+        return BeautifulSoup(html, PARSER)
+
+
+def page_fragment(driver, selector: str) -> str:
+    """outerHTML of every element matching selector, in one WebDriver call"""
+    with timing.stage(timing.EXTRACT):
+        return driver.execute_script(_FRAGMENT_JS, selector) or ""
+
+
+def select_on_page(driver, selector: str) -> list:
+    """Elements matching selector, fetched in one call and parsed once.
+
+    The fragment holds only the matched elements, not their ancestors, so
+    they are its top-level nodes — re-running a descendant selector such
+    as ".list .item" on it would match nothing.
+    """
+    body = parse_html(page_fragment(driver, selector)).body
+    if body is None:
+        return []
+    return [el for el in body.children if isinstance(el, Tag)]
@@ -0,0 +1,111 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import timing
+
+# =========================
+# CONFIG
+# =========================
+
+WORKERS = 8
+POOL_MAXSIZE = 16
+TIMEOUT = 20
+
+HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+    ),
+    "Accept": "text/html,application/xhtml+xml",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+
+class NeedsBrowser(Exception):
+    """The plain HTML has no price data, the page has to be rendered in Chrome"""
+
+# =========================
+# SESSION
+# =========================
+
+_local = threading.local()
+
+
+def get_session() -> requests.Session:
+    """One keep-alive session per thread, reused for every request"""
+    session = getattr(_local, "session", None)
+    if session is None:
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=POOL_MAXSIZE,
+            max_retries=Retry(total=2, backoff_factor=0.5, status_forcelist=(429, 502, 503, 504)),
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers.update(HEADERS)
+        _local.session = session
+    return session
+
+
+def fetch(url: str) -> tuple[int, str | None]:
+    """GET a page, returns (status, html); status 0 means the request failed"""
+    with timing.stage(timing.FETCH):
+        try:
+            resp = get_session().get(url, timeout=TIMEOUT)
+        except requests.RequestException:
+            return 0, None
+        return resp.status_code, resp.text
+
+
+def check_response(status: int, html: str | None, url: str) -> str | None:
+    """HTML of a product page, None for 404, NeedsBrowser when blocked/failed"""
+    if status == 404:
+        return None
+    if status != 200 or not html:
+        raise NeedsBrowser(url)
+    return html
+
+# =========================
+# BATCH
+# =========================
+
+def price_items(lookup, items, workers=WORKERS, on_result=None, on_needs_browser=None):
+    """Run lookup(None, item) for every item over pooled HTTP sessions.
+
+    Returns (results, needs_browser): results maps item → raw price for
+    everything answered from plain HTML, needs_browser lists the items
+    that have to go through Selenium. on_needs_browser() is called once,
+    at the first of those.
+    """
+    results = {}
+    needs_browser = []
+
+    executor = ThreadPoolExecutor(max_workers=workers)
+
+    try:
+        futures = {executor.submit(lookup, None, item): item for item in items}
+        for future in as_completed(futures):
+            item = futures[future]
+            try:
+                results[item] = future.result()
+            except NeedsBrowser:
+                if not needs_browser and on_needs_browser:
+                    on_needs_browser()
+                needs_browser.append(item)
+                continue
+            except Exception as e:
+                # like the async engine: one broken page doesn't end the batch
+                print(f"✖ Lookup error for {item}: {e}")
+                results[item] = None
+            if on_result:
+                on_result(item, results[item])
+    finally:
+        # on Ctrl+C / a stopped run don't wait for the queued lookups
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    return results, needs_browser
@@ -2,15 +2,21 @@ import os
 import re
 import time
 import pandas as pd
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
-from bs4 import BeautifulSoup
+
+import async_fetch
+import checkpoint
+import driver_factory
+import html_parse
+import http_fetch
+import price_cache
+import slugs
+import timing
+import workbook
+from driver_pool import DriverPool
 
 
 # =========================
@@ -19,7 +25,16 @@ from bs4 import BeautifulSoup
 
 EXCEL_FILE = "Problematic Withdrawals.xlsx"
 ITEM_COL = "steam_market_hash_name"
+SITE = "keydrop"
 PRICE_COL = "keydrop_price"
+BASE_URL = "https://key-drop.com/ru/skins/product/"
+POOL_SIZE = os.cpu_count() or 1
+FETCH_ENGINE = "async"  # "async", "http" or "selenium"
+
+STICKER_TITLE_SELECTOR = (
+    "h2.mx-auto.flex.items-center.whitespace-nowrap.text-center.text-xl"
+    ".font-semibold.uppercase.leading-tight.text-white.lg\\:px-6"
+)
 
 def format_skin_url(skin_name):
     skin_name = skin_name.replace("★ ", "").replace("StatTrak™", "").strip()
@@ -54,6 +69,22 @@ def format_skin_url(skin_name):
         url = f"StatTrak-{url}"
     return url
 
+def format_skin_slugs(names: pd.Series) -> pd.Series:
+    """Vectorized format_skin_url for weapon names; NaN for stickers / odd names"""
+    clean = (
+        names.str.replace("★ ", "", regex=False)
+        .str.replace("StatTrak™", "", regex=False)
+        .str.strip()
+    )
+    parts = clean.str.split(" | ", regex=False)
+    weapon = parts.str[0].str.strip().str.replace(" ", "-", regex=False)
+    name = parts.str[1].str.split(" (", regex=False).str[0].str.strip().str.replace(" ", "-", regex=False)
+
+    slug = weapon + "-" + name
+    slug = slug.where(~clean.str.contains("StatTrak", regex=False), "StatTrak-" + slug)
+    return slug.where(~clean.str.startswith("Sticker"))
+
+@timing.timed(timing.PRICE_PARSE)
 def extract_price_number(price_str):
     return float(
         price_str.replace(" ", "")
@@ -63,42 +94,28 @@ def extract_price_number(price_str):
         .strip()
     )
 
-def get_skin_price(driver, skin_name):
-    url = f"https://key-drop.com/ru/skins/product/{format_skin_url(skin_name)}"
-
-    try:
-        driver.set_page_load_timeout(20)
-        driver.get(url)
-    except TimeoutException:
-        return None
-    except Exception:
-        return None
-
+def product_url(skin_name):
     if "|" not in skin_name:
         return None
-
-    try:
-        WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.TAG_NAME, "tr")))
-    except Exception:
+    slug = slugs.slug_for(SITE, skin_name, format_skin_url)
+    if slug is None:
         return None
+    return f"{BASE_URL}{slug}"
 
-    soup = BeautifulSoup(driver.page_source, "html.parser")
+
+def parse_price_html(html, skin_name):
+    soup = html_parse.parse_html(html)
 
     if skin_name.strip().startswith("Sticker"):
         # шукаємо таблицю з класом, де є елемент <td class="text-[#8BBCDD]">
-        try:
-            header_elem = WebDriverWait(driver, 5).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR,
-                    "h2.mx-auto.flex.items-center.whitespace-nowrap.text-center.text-xl.font-semibold.uppercase.leading-tight.text-white.lg\\:px-6"
-                ))
-            )
-            site_title = header_elem.text.strip().strip().upper()
+        header_elem = soup.select_one(STICKER_TITLE_SELECTOR)
+        if header_elem is None:
+            return None
 
-            clean_expected = skin_name.strip().upper()
+        site_title = header_elem.get_text(" ", strip=True).upper()
+        clean_expected = skin_name.strip().upper()
 
-            if clean_expected != site_title:
-                return None
-        except Exception:
+        if clean_expected != site_title:
             return None
         
         table = soup.select_one("table.grid")
@@ -115,6 +132,8 @@ def get_skin_price(driver, skin_name):
 
         return None
     
+    if "(" not in skin_name:
+        return None  # no wear, no row to match
     quality = skin_name.split("(")[1].replace(")", "").strip()
     is_stattrak = "StatTrak" in skin_name
     is_knife = "★" in skin_name
@@ -139,6 +158,74 @@ def get_skin_price(driver, skin_name):
     return None
 
 
+def price_from_response(skin_name, status, final_url, html):
+    """Shared by the HTTP and asyncio engines, raises NeedsBrowser if the table is missing"""
+    html = http_fetch.check_response(status, html, final_url)
+    if html is None:
+        return price_cache.NOT_FOUND
+
+    if "<tr" not in html:
+        raise http_fetch.NeedsBrowser(skin_name)
+
+    # the price table is there, just not this item / quality
+    price = parse_price_html(html, skin_name)
+    return price_cache.NOT_FOUND if price is None else price
+
+
+def fetch_skin_price(skin_name):
+    """Plain HTTP path: no browser"""
+    url = product_url(skin_name)
+    if url is None:
+        return price_cache.NOT_FOUND
+
+    status, html = http_fetch.fetch(url)
+    return price_from_response(skin_name, status, url, html)
+
+
+@price_cache.cached(SITE, precheck=price_cache.not_a_skin)
+def get_skin_price(driver, skin_name):
+    if "|" not in skin_name:
+        return price_cache.NOT_FOUND
+
+    # driver=None → HTTP engine, Selenium is only the fallback
+    if driver is None:
+        return fetch_skin_price(skin_name)
+
+    url = product_url(skin_name)
+    if url is None:
+        return price_cache.NOT_FOUND
+
+    try:
+        driver.set_page_load_timeout(20)
+        with timing.stage(timing.NAVIGATE):
+            driver.get(url)
+    except TimeoutException:
+        return None
+    except Exception:
+        return None
+
+    try:
+        with timing.stage(timing.WAIT):
+            WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.TAG_NAME, "tr")))
+    except Exception:
+        return None
+
+    if skin_name.strip().startswith("Sticker"):
+        try:
+            with timing.stage(timing.WAIT):
+                WebDriverWait(driver, 5).until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, STICKER_TITLE_SELECTOR))
+                )
+        except Exception:
+            return None
+
+    with timing.stage(timing.EXTRACT):
+        html = driver.page_source
+
+    price = parse_price_html(html, skin_name)
+    return price_cache.NOT_FOUND if price is None else price
+
+
 # =========================
 # EXCEL WORKFLOW (AS BEFORE)
 # =========================
@@ -155,66 +242,98 @@ def choose_sheets(xls: pd.ExcelFile) -> list[str]:
     return [xls.sheet_names[int(choice) - 1]]
 
 
-def process_sheets(sheet_names):
-    options = Options()
-    options.add_argument("--headless")
-    options.add_argument("--disable-blink-features=AutomationControlled")
+def to_price(raw):
+    if raw is None or raw == price_cache.NOT_FOUND:
+        return raw
+    try:
+        return extract_price_number(raw)
+    except Exception:
+        return None
 
-    driver = webdriver.Chrome(
-        service=Service(ChromeDriverManager().install()),
-        options=options
-    )
 
-    xls = pd.ExcelFile(EXCEL_FILE)
-    writer = pd.ExcelWriter(
-        EXCEL_FILE,
-        engine="openpyxl",
-        mode="a",
-        if_sheet_exists="replace"
-    )
-    
-    try:
-        total = len(sheet_names)
-        idx = 0
+def prepare(items):
+    """Once per run, before any lookups (also before worker processes start)"""
+    slugs.build_index(SITE, items, format_skin_url, format_skin_slugs)
 
-        for sheet in xls.sheet_names:
-            df = pd.read_excel(xls, sheet_name=sheet)
 
-            if sheet in sheet_names and ITEM_COL in df.columns:
-                idx += 1
-                print(f"\n=== Processing sheet {idx}/{total}: {sheet} ===")
+def price_items(items, on_price, engine=FETCH_ENGINE, pool_size=POOL_SIZE):
+    """Every lookup pass over items; on_price(item, price or None) per item"""
+    def report(item, raw):
+        on_price(item, to_price(raw))
 
-                prices = []
-                items = df[ITEM_COL].astype(str).tolist()
+    # created at the first page that needs the browser, so pure HTTP runs
+    # never start Chrome, and the fallback starts hot when it is needed
+    pool = None
 
-                for i, item in enumerate(items, start=1):
-                    raw = get_skin_price(driver, item)
-                    if raw is None:
-                        prices.append("-")
-                        print(f"[{i}/{len(items)}] No price found for {item}")
-                    else:
-                        try:
-                            price = extract_price_number(raw)
-                            prices.append(price)
-                            print(f"[{i}/{len(items)}] {item} → {price}")
-                        except Exception:
-                            prices.append("-")
-                            print(f"[{i}/{len(items)}] No price found for {item}")
+    def warm():
+        nonlocal pool
+        pool = DriverPool(pool_size, prewarm=driver_factory.PREWARM)
+
+    try:
+        browser_items = items
+        if engine == "async":
+            print(f"\n=== Async pass: {len(items)} items ===")
+            browser_items = async_fetch.run_lookups(
+                items, product_url, price_from_response, report, site=SITE, on_needs_browser=warm
+            )
+        elif engine == "http":
+            print(f"\n=== HTTP pass: {len(items)} items ===")
+            _, browser_items = http_fetch.price_items(
+                get_skin_price, items, on_result=report, on_needs_browser=warm
+            )
+
+        if browser_items:
+            if pool is None:
+                pool = DriverPool(pool_size)
+            print(f"\n=== Browser pass: {len(browser_items)} items with {pool.size} drivers ===")
+            pool.map(get_skin_price, browser_items, on_result=lambda i, item, raw: report(item, raw))
 
-                df[PRICE_COL] = prices
+    finally:
+        if pool is not None:
+            pool.close()
 
-            df.to_excel(writer, sheet_name=sheet, index=False)
+
+@timing.traced(SITE)
+def process_sheets(sheet_names, pool_size=POOL_SIZE, engine=FETCH_ENGINE, write=True):
+    xls = pd.ExcelFile(EXCEL_FILE)
+    frames = workbook.read_sheets(xls, sheet_names)
+    items = workbook.plan_items(frames, sheet_names, ITEM_COL)
+
+    price_map = checkpoint.PriceJournal(SITE, EXCEL_FILE, frames, sheet_names, ITEM_COL)
+    items = price_map.pending(items)
+    prepare(items)
+    done = 0
+
+    def report(item, price):
+        nonlocal done
+        done += 1
+        if price is None:
+            price_map.fail(item)
+            print(f"[{done}/{len(items)}] Lookup failed for {item}")
+        else:
+            price_map[item] = price
+            print(f"[{done}/{len(items)}] {item} → {price}")
+
+    try:
+        price_items(items, report, engine, pool_size)
 
     except KeyboardInterrupt:
         print("\n⚠ Interrupted by user. Processing stopped.")
-        writer.close()
-        driver.quit()
+        print(f"💾 Progress kept in {price_map.path}, re-run to resume")
         return
 
     finally:
-        driver.quit()
+        price_map.close()
+
+    # merge.py writes every site in one pass
+    if not write:
+        price_map.mark_complete()
+        print(f"📒 Prices kept in {price_map.path} for merge.py")
+        return
 
-    writer.close()
+    filled = workbook.write_prices(EXCEL_FILE, sheet_names, PRICE_COL, price_map.with_failed(), ITEM_COL)
+    price_map.finish()
+    print(f"💾 Saved {len(filled)} sheet(s)")
 
 # =========================
 # ENTRYPOINT
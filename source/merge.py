@@ -0,0 +1,91 @@
+import os
+
+import checkpoint
+import workbook
+from price_store import PriceStore
+
+# =========================
+# CONFIG
+# =========================
+
+EXCEL_FILE = "Problematic Withdrawals.xlsx"
+ITEM_COL = "steam_market_hash_name"
+
+# sites priced row by row (their journals are merged)
+LOOKUP_SITES = ["keydrop", "farmskins", "skinclub", "ggdrop", "casedrop", "csgocases"]
+
+# case crawlers (their Parquet price stores are merged)
+CRAWL_SITES = ["g4skins", "csgoskins"]
+
+# =========================
+# COLLECT
+# =========================
+
+def collect_price_maps(excel_file=EXCEL_FILE):
+    """Every site's price map that is waiting to be merged.
+
+    Returns (columns, cleanups) — columns in the format of
+    workbook.merge_price_maps, cleanups to run after a successful merge.
+    """
+    columns = {}
+    cleanups = []
+
+    for site in LOOKUP_SITES:
+        path = checkpoint.journal_path(excel_file, site)
+        if not os.path.exists(path):
+            continue
+        prices, sheets, complete = checkpoint.read_journal(path)
+        if not complete:
+            # interrupted or still running — re-run the site to finish it
+            print(f"⏭ {site}: {path} is not complete, skipped")
+            continue
+        columns[f"{site}_price"] = (prices, sheets)
+        cleanups.append((path, lambda path=path: os.remove(path)))
+        print(f"📒 {site}: {len(prices)} prices from {path}")
+
+    for site in CRAWL_SITES:
+        store = PriceStore(site)
+        if not store.exists():
+            continue
+        prices = store.price_map()
+        columns[f"{site}_price"] = (prices, None)
+        cleanups.append((store.path, store.clear))
+        print(f"📘 {site}: {len(prices)} prices from {store.path}")
+
+    return columns, cleanups
+
+
+def merge_all(excel_file=EXCEL_FILE, cleanup=True):
+    columns, cleanups = collect_price_maps(excel_file)
+    if not columns:
+        print("ℹ Nothing to merge")
+        return
+
+    print(f"🔗 Merging {len(columns)} price column(s) into {excel_file} ...")
+    workbook.merge_price_maps(excel_file, columns, ITEM_COL)
+
+    if cleanup:
+        for path, cleanup in cleanups:
+            cleanup()
+            print(f"🗑 Removed: {path}")
+
+# =========================
+# ENTRYPOINT
+# =========================
+
+def main():
+    if not os.path.exists(EXCEL_FILE):
+        print(f"❌ File '{EXCEL_FILE}' not found")
+        return
+
+    try:
+        merge_all()
+    except Exception as e:
+        print(f"❌ Merge failed, files not deleted: {e}")
+        return
+
+    print("\n✅ Done.")
+
+
+if __name__ == "__main__":
+    main()
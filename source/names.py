@@ -0,0 +1,66 @@
+import re
+from functools import lru_cache
+
+# =========================
+# CONFIG
+# =========================
+
+WEAR_MAP = {
+    "FN": "Factory New",
+    "MW": "Minimal Wear",
+    "FT": "Field-Tested",
+    "WW": "Well-Worn",
+    "BS": "Battle-Scarred"
+}
+
+STAR_KEYWORDS = [
+    "Knife", "Gloves", "Karambit",
+    "Bayonet", "Shadow Daggers", "Hand Wraps"
+]
+
+CACHE_SIZE = 65536
+
+# "(FN)" / "FN" wear codes and the "ST" StatTrak marker, in one pattern
+_WEAR = "|".join(WEAR_MAP)
+_TOKEN_RE = re.compile(rf"\(\s*({_WEAR})\s*\)|\b({_WEAR}|ST)\b")
+_STAR_RE = re.compile("|".join(re.escape(k) for k in STAR_KEYWORDS), re.IGNORECASE)
+
+# =========================
+# NORMALIZER
+# =========================
+
+@lru_cache(maxsize=CACHE_SIZE)
+def normalize(name: str, star: bool = False) -> str:
+    """Site name with short codes → steam_market_hash_name.
+
+    "AK-47 | Redline ST FT" → "StatTrak™ AK-47 | Redline (Field-Tested)".
+    With star=True knives/gloves also get the "★ " prefix.
+    """
+    if not isinstance(name, str):
+        return name
+
+    wear_found = None
+    stattrak = False
+
+    def take(match):
+        nonlocal wear_found, stattrak
+        code = match.group(1) or match.group(2)
+        if code == "ST":
+            stattrak = True
+        elif wear_found is None:
+            wear_found = WEAR_MAP[code]
+        return " "
+
+    # один прохід: вирізаємо всі коди, пробіли схлопуємо
+    name = " ".join(_TOKEN_RE.sub(take, name).split())
+
+    if stattrak:
+        name = f"StatTrak™ {name}"
+
+    if star and _STAR_RE.search(name) and not name.startswith("★"):
+        name = f"★ {name}"
+
+    if wear_found:
+        name = f"{name} ({wear_found})"
+
+    return name
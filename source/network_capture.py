@@ -0,0 +1,130 @@
+import json
+from collections import deque
+
+# =========================
+# CONFIG
+# =========================
+
+# keys tried in order when looking for (name, price) pairs in a payload
+NAME_KEYS = ("market_hash_name", "hash_name", "full_name", "fullName", "name", "title")
+PRICE_KEYS = ("price", "sell_price", "sellPrice", "resell_price", "cost")
+
+# =========================
+# CHROME
+# =========================
+
+def enable_capture(options):
+    """Turn on Chrome's performance log; set before webdriver.Chrome(...)"""
+    options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    return options
+
+
+class NetworkCapture:
+    """JSON responses the page fetched over XHR/fetch, read through CDP.
+
+    Works the same on a fresh headless Chrome and on the one attached via
+    debuggerAddress (port 9222). Every collect() drains the performance
+    log, pulls the bodies of finished JSON responses whose URL contains
+    url_part, and adds their (name, price) pairs to .prices — so a single
+    catalog-sized response prices every item in it.
+    """
+
+    def __init__(self, driver, url_part: str = "", scale: float = 1):
+        self.driver = driver
+        self.url_part = url_part
+        self.scale = scale
+        self.prices = {}
+        self._pending = {}
+
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.get_log("performance")  # old entries are of no use
+
+    def drain(self) -> list:
+        """(url, payload) for every JSON response finished since the last call"""
+        found = []
+
+        for entry in self.driver.get_log("performance"):
+            try:
+                message = json.loads(entry["message"])["message"]
+            except (KeyError, ValueError):
+                continue
+
+            method = message.get("method")
+            params = message.get("params", {})
+
+            if method == "Network.responseReceived":
+                response = params.get("response", {})
+                if "json" in response.get("mimeType", "") and self.url_part in response.get("url", ""):
+                    self._pending[params["requestId"]] = response["url"]
+
+            # тіло можна забрати лише коли відповідь повністю завантажена
+            elif method == "Network.loadingFinished" and params.get("requestId") in self._pending:
+                url = self._pending.pop(params["requestId"])
+                try:
+                    body = self.driver.execute_cdp_cmd(
+                        "Network.getResponseBody", {"requestId": params["requestId"]}
+                    )
+                    found.append((url, json.loads(body["body"])))
+                except Exception:
+                    continue
+
+        return found
+
+    def collect(self) -> int:
+        """Drain the log into .prices; returns how many names were added"""
+        before = len(self.prices)
+        for _, payload in self.drain():
+            for name, price in find_prices(payload).items():
+                self.prices[name] = price / self.scale
+        return len(self.prices) - before
+
+    def price(self, name: str):
+        return self.prices.get(name)
+
+    def lookup(self, name: str):
+        """collect() first, then the price for name or None"""
+        self.collect()
+        return self.price(name)
+
+# =========================
+# PAYLOAD
+# =========================
+
+def to_number(value) -> float | None:
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        cleaned = "".join(ch for ch in value if ch.isdigit() or ch in ".,").replace(",", ".")
+        try:
+            return float(cleaned)
+        except ValueError:
+            return None
+    return None
+
+
+def find_prices(payload, name_keys=NAME_KEYS, price_keys=PRICE_KEYS) -> dict:
+    """name → price for every object in the payload that has both keys"""
+    prices = {}
+    queue = deque([payload])
+
+    # breadth-first, so the first object with a name wins
+    while queue:
+        node = queue.popleft()
+
+        if isinstance(node, list):
+            queue.extend(node)
+            continue
+        if not isinstance(node, dict):
+            continue
+
+        name = next((node[k] for k in name_keys if isinstance(node.get(k), str)), None)
+        price = next((p for p in (to_number(node.get(k)) for k in price_keys) if p is not None), None)
+
+        if name and price is not None:
+            prices.setdefault(name, price)
+
+        queue.extend(v for v in node.values() if isinstance(v, (list, dict)))
+
+    return prices
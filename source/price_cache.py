@@ -0,0 +1,225 @@
+import functools
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+import timing
+
+# =========================
+# CONFIG
+# =========================
+
+CACHE_FILE = "price_cache.sqlite3"
+MAX_ENTRIES = 50_000
+
+HOUR = 60 * 60
+DEFAULT_TTL = 6 * HOUR
+SITE_TTL = {
+    "keydrop": 6 * HOUR,
+    "farmskins": 6 * HOUR,
+    "skinclub": 12 * HOUR,
+    "ggdrop": 3 * HOUR,
+    "casedrop": 3 * HOUR,
+    "csgocases": 3 * HOUR,
+}
+
+# a lookup returns this when the site answered "we don't have it" (404,
+# no matching row…); None means the lookup itself failed and is retried
+NOT_FOUND = "-"
+
+# "site doesn't sell it" is re-checked sooner than a real price
+DEFAULT_NEGATIVE_TTL = 1 * HOUR
+SITE_NEGATIVE_TTL = {
+    "keydrop": 2 * HOUR,
+    "farmskins": 2 * HOUR,
+    "skinclub": 2 * HOUR,
+}
+
+# =========================
+# STORAGE
+# =========================
+
+_lock = threading.Lock()
+_conn = None
+
+
+def _connect() -> sqlite3.Connection:
+    global _conn
+    if _conn is None:
+        # shard workers share the file: wait for a writer instead of failing on "database is locked"
+        _conn = sqlite3.connect(CACHE_FILE, check_same_thread=False, timeout=30)
+        _conn.execute("PRAGMA journal_mode=WAL")
+        _conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS prices (
+                key TEXT PRIMARY KEY,
+                site TEXT NOT NULL,
+                name TEXT NOT NULL,
+                value TEXT NOT NULL,
+                stored_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        _conn.execute("CREATE INDEX IF NOT EXISTS prices_lru ON prices (accessed_at)")
+        _conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS negatives (
+                key TEXT PRIMARY KEY,
+                site TEXT NOT NULL,
+                name TEXT NOT NULL,
+                reason TEXT NOT NULL,
+                stored_at REAL NOT NULL
+            )
+            """
+        )
+        _conn.commit()
+    return _conn
+
+
+def make_key(site: str, name: str) -> str:
+    return hashlib.sha1(f"{site}\x00{name}".encode("utf-8")).hexdigest()
+
+
+def get(site: str, name: str):
+    """Return (hit, value); expired rows count as a miss and are dropped"""
+    key = make_key(site, name)
+    now = time.time()
+    ttl = SITE_TTL.get(site, DEFAULT_TTL)
+
+    with _lock:
+        conn = _connect()
+        row = conn.execute(
+            "SELECT value, stored_at FROM prices WHERE key = ?", (key,)
+        ).fetchone()
+
+        if row is None:
+            return False, None
+
+        value, stored_at = row
+        if now - stored_at > ttl:
+            conn.execute("DELETE FROM prices WHERE key = ?", (key,))
+            conn.commit()
+            return False, None
+
+        conn.execute("UPDATE prices SET accessed_at = ? WHERE key = ?", (now, key))
+        conn.commit()
+
+    return True, json.loads(value)
+
+
+def put(site: str, name: str, value):
+    now = time.time()
+
+    with _lock:
+        conn = _connect()
+        conn.execute(
+            "INSERT OR REPLACE INTO prices VALUES (?, ?, ?, ?, ?, ?)",
+            (make_key(site, name), site, name, json.dumps(value), now, now),
+        )
+
+        # LRU: drop the least recently read rows over the limit
+        (count,) = conn.execute("SELECT COUNT(*) FROM prices").fetchone()
+        if count > MAX_ENTRIES:
+            conn.execute(
+                "DELETE FROM prices WHERE key IN "
+                "(SELECT key FROM prices ORDER BY accessed_at LIMIT ?)",
+                (count - MAX_ENTRIES,),
+            )
+        conn.commit()
+
+
+def clear(site: str | None = None):
+    with _lock:
+        conn = _connect()
+        for table in ("prices", "negatives"):
+            if site is None:
+                conn.execute(f"DELETE FROM {table}")
+            else:
+                conn.execute(f"DELETE FROM {table} WHERE site = ?", (site,))
+        conn.commit()
+
+# =========================
+# NEGATIVE CACHE
+# =========================
+
+def get_negative(site: str, name: str) -> str | None:
+    """Reason the site had no price for this item last time, None if unknown/expired"""
+    key = make_key(site, name)
+    ttl = SITE_NEGATIVE_TTL.get(site, DEFAULT_NEGATIVE_TTL)
+
+    with _lock:
+        conn = _connect()
+        row = conn.execute(
+            "SELECT reason, stored_at FROM negatives WHERE key = ?", (key,)
+        ).fetchone()
+
+        if row is None:
+            return None
+
+        reason, stored_at = row
+        if time.time() - stored_at > ttl:
+            conn.execute("DELETE FROM negatives WHERE key = ?", (key,))
+            conn.commit()
+            return None
+
+    return reason
+
+
+def put_negative(site: str, name: str, reason: str):
+    with _lock:
+        conn = _connect()
+        conn.execute(
+            "INSERT OR REPLACE INTO negatives VALUES (?, ?, ?, ?, ?)",
+            (make_key(site, name), site, name, reason, time.time()),
+        )
+        conn.commit()
+
+
+def not_a_skin(name: str) -> str | None:
+    """Name-shape check shared by the parsers: cases, keys etc. have no " | " """
+    if "|" not in name:
+        return "no | in name"
+    return None
+
+# =========================
+# DECORATOR
+# =========================
+
+def cached(site: str, precheck=None):
+    """Wrap a get_*price(..., skin_name) function with the on-disk cache.
+
+    The hash name is always the last positional argument. precheck(name)
+    returns a reason when the name can't be on the site at all. That, a
+    negative-cache hit or a price hit all return before the wrapped
+    function runs, so nothing is typed or loaded. Only a NOT_FOUND result
+    is stored as a negative entry; None (timeout, crashed driver, parse
+    error) is returned as is and the next call tries the site again.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            skin_name = args[-1]
+
+            with timing.item(site, skin_name):
+                if precheck and precheck(skin_name):
+                    return NOT_FOUND
+
+                if get_negative(site, skin_name):
+                    return NOT_FOUND
+
+                hit, value = get(site, skin_name)
+                if hit:
+                    return value
+
+                value = fn(*args, **kwargs)
+                if value == NOT_FOUND:
+                    put_negative(site, skin_name, "no price")
+                elif value is not None:
+                    put(site, skin_name, value)
+                return value
+
+        return wrapper
+    return decorator
@@ -0,0 +1,111 @@
+import glob
+import os
+import shutil
+import time
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# =========================
+# CONFIG
+# =========================
+
+STORE_DIR = "price_store"
+ITEM_COL = "steam_market_hash_name"
+
+SCHEMA = pa.schema([
+    ("hash_name", pa.string()),
+    ("price", pa.string()),
+    ("site", pa.string()),
+    ("timestamp", pa.float64()),
+])
+
+# =========================
+# STORE
+# =========================
+
+class PriceStore:
+    """Append-only Parquet store of scraped (hash_name, price, site, timestamp).
+
+    Every append writes one small part file, so a checkpoint costs the same
+    no matter how much was scraped before. xlsx is only an export.
+    """
+
+    def __init__(self, site: str, root: str = STORE_DIR):
+        self.site = site
+        # the directory is created by the first append(), so building a
+        # store (e.g. to check whether there is one) touches nothing
+        self.path = os.path.join(root, site)
+
+    def _parts(self) -> list[str]:
+        return sorted(glob.glob(os.path.join(self.path, "part-*.parquet")))
+
+    def append(self, rows):
+        """rows: iterable of (hash_name, price)"""
+        rows = list(rows)
+        if not rows:
+            return
+
+        now = time.time()
+        table = pa.Table.from_pylist(
+            [
+                {"hash_name": name, "price": str(price), "site": self.site, "timestamp": now}
+                for name, price in rows
+            ],
+            schema=SCHEMA,
+        )
+        # unique name: parallel writers never collide and order is kept
+        os.makedirs(self.path, exist_ok=True)
+        part = os.path.join(self.path, f"part-{time.time_ns()}-{os.getpid()}.parquet")
+        pq.write_table(table, part)
+
+    def read(self) -> pd.DataFrame:
+        parts = self._parts()
+        if not parts:
+            return pd.DataFrame(columns=SCHEMA.names)
+        return pq.read_table(parts, schema=SCHEMA).to_pandas()
+
+    def names(self) -> set:
+        parts = self._parts()
+        if not parts:
+            return set()
+        return set(pq.read_table(parts, columns=["hash_name"]).column("hash_name").to_pylist())
+
+    def distinct(self) -> pd.DataFrame:
+        """First price per hash name, as steam_market_hash_name / <site>_price"""
+        df = self.read().sort_values("timestamp", kind="stable")
+        df = (
+            df
+            .dropna(subset=["hash_name"])
+            .drop_duplicates("hash_name", keep="first")
+        )
+        return df.rename(columns={"hash_name": ITEM_COL, "price": f"{self.site}_price"})[
+            [ITEM_COL, f"{self.site}_price"]
+        ]
+
+    def price_map(self) -> dict:
+        df = self.distinct()
+        return df.set_index(ITEM_COL)[f"{self.site}_price"].to_dict()
+
+    def compact(self):
+        """Rewrite all parts as one deduplicated part"""
+        parts = self._parts()
+        if len(parts) <= 1:
+            return
+
+        df = self.distinct()
+        self.append(zip(df[ITEM_COL], df[f"{self.site}_price"]))
+        for part in parts:
+            os.remove(part)
+
+    def export_xlsx(self, path: str) -> int:
+        df = self.distinct()
+        df.to_excel(path, index=False)
+        return len(df)
+
+    def clear(self):
+        shutil.rmtree(self.path, ignore_errors=True)
+
+    def exists(self) -> bool:
+        return bool(self._parts())
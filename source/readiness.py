@@ -0,0 +1,79 @@
+import time
+
+import timing
+
+# =========================
+# CONFIG
+# =========================
+
+TIMEOUT = 5.0   # upper bound for one wait, seconds
+QUIET = 0.25    # DOM + network must be still this long
+POLL = 0.05
+
+# Installs (once per page) a MutationObserver on <body> and counters around
+# fetch/XHR, then reports the current state for the given selector.
+_PROBE_JS = """
+const selector = arguments[0];
+if (!window.__ready) {
+    const st = window.__ready = {mutations: 0, last: performance.now(), inflight: 0};
+    const touch = () => { st.last = performance.now(); };
+
+    new MutationObserver(() => { st.mutations++; touch(); })
+        .observe(document.body, {childList: true, subtree: true, characterData: true});
+
+    const origFetch = window.fetch;
+    window.fetch = function () {
+        st.inflight++; touch();
+        return origFetch.apply(this, arguments).finally(() => { st.inflight--; touch(); });
+    };
+
+    const origSend = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function () {
+        st.inflight++; touch();
+        this.addEventListener("loadend", () => { st.inflight--; touch(); });
+        return origSend.apply(this, arguments);
+    };
+}
+const st = window.__ready;
+return {
+    count: document.querySelectorAll(selector).length,
+    mutations: st.mutations,
+    inflight: st.inflight,
+    idle: (performance.now() - st.last) / 1000,
+};
+"""
+
+# =========================
+# WAITS
+# =========================
+
+def snapshot(driver, selector: str) -> dict:
+    """Current result count / mutation counter; take one before typing"""
+    return driver.execute_script(_PROBE_JS, selector)
+
+
+@timing.timed(timing.WAIT)
+def wait_for_change(driver, selector: str, before: dict | None = None,
+                    timeout: float = TIMEOUT, quiet: float = QUIET) -> dict:
+    """Wait until results changed since `before` and the page went quiet.
+
+    "Changed" means the result count differs or the DOM mutated; "quiet"
+    means no fetch/XHR in flight and no mutation for `quiet` seconds.
+    With before=None only the quiet part is checked. Never waits longer
+    than `timeout` — returns the last state either way.
+    """
+    deadline = time.monotonic() + timeout
+
+    while True:
+        state = snapshot(driver, selector)
+
+        changed = before is None or (
+            state["count"] != before["count"]
+            or state["mutations"] != before["mutations"]
+        )
+        settled = state["inflight"] == 0 and state["idle"] >= quiet
+
+        if (changed and settled) or time.monotonic() >= deadline:
+            return state
+
+        time.sleep(POLL)
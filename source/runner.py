@@ -0,0 +1,250 @@
+import importlib
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import pandas as pd
+
+import checkpoint
+import price_cache
+import timing
+import workbook
+
+# =========================
+# CONFIG
+# =========================
+
+EXCEL_FILE = "Problematic Withdrawals.xlsx"
+ITEM_COL = "steam_market_hash_name"
+
+# site → plugin module, in the order they are priced
+SITES = {
+    "keydrop": "keydrop_parser",
+    "farmskins": "farmskins_parser",
+    "skinclub": "skinclub_parser",
+    "ggdrop": "ggdrop_parser",
+    "casedrop": "casedrop_parser",
+    "csgocases": "csgocases_parser",
+    "g4skins": "g4skins_parser",
+    "csgoskins": "csgoskins_parser",
+}
+
+# what a site module has to provide to be run from here
+PLUGIN_API = ("SITE", "PRICE_COL", "prepare", "price_items")
+
+# sites in one lane share something and run one after another; lanes run
+# at the same time, so a run takes about as long as its slowest lane
+LANES = [
+    ["keydrop"],
+    ["farmskins"],
+    ["skinclub"],
+    ["ggdrop"],
+    # усі чіпляються до одного debug Chrome на 127.0.0.1:9222
+    ["casedrop", "csgocases", "g4skins", "csgoskins"],
+]
+MAX_PARALLEL = len(LANES)  # 1 = the old one-site-at-a-time order
+
+# per-site caps while other sites run next to it (extra price_items arguments)
+SITE_OPTIONS = {
+    "keydrop": {"pool_size": 2},
+    "g4skins": {"workers": 3},
+    "csgoskins": {"workers": 3},
+}
+
+
+class Stopped(BaseException):
+    """Raised inside a site's lookup loop once the run was interrupted.
+
+    A BaseException, like KeyboardInterrupt, so the parsers' broad
+    `except Exception` around a lookup doesn't swallow it.
+    """
+
+# =========================
+# PLUGINS
+# =========================
+
+def load_plugin(site_name: str):
+    """The site's parser module, checked against PLUGIN_API"""
+    module = importlib.import_module(SITES[site_name])
+
+    missing = [name for name in PLUGIN_API if not hasattr(module, name)]
+    if missing:
+        raise TypeError(f"{module.__name__} is not a site plugin, missing: {', '.join(missing)}")
+    return module
+
+
+def price_site(plugin, items: list, price_map, stop=None, options=None) -> int:
+    """One site's lookup pass into its journal; returns how many were priced"""
+    items = price_map.pending(items)
+    plugin.prepare(items)
+    found = done = 0
+
+    def report(item, price):
+        nonlocal found, done
+        if stop is not None and stop.is_set():
+            raise Stopped(plugin.SITE)
+
+        done += 1
+        if price is None:
+            price_map.fail(item)
+        else:
+            price_map[item] = price
+            if price != price_cache.NOT_FOUND:
+                found += 1
+        print(f"[{plugin.SITE} {done}/{len(items)}] {item} → {price}")
+
+    if items:
+        plugin.price_items(items, report, **(options or {}))
+    print(f"✔ {plugin.SITE}: {found}/{len(items)} prices found")
+    return found
+
+# =========================
+# RUN
+# =========================
+
+def make_lanes(site_names) -> list[list[str]]:
+    """LANES narrowed to the chosen sites; a site in no lane gets its own"""
+    lanes = [[name for name in lane if name in site_names] for lane in LANES]
+    lanes = [lane for lane in lanes if lane]
+
+    grouped = {name for lane in LANES for name in lane}
+    lanes += [[name] for name in site_names if name not in grouped]
+    return lanes
+
+
+@timing.traced("runner")
+def run(sheet_names, site_names=None, write=True, parallel=MAX_PARALLEL):
+    """Price every selected site over one read of the workbook and one write.
+
+    Items are planned once and shared by all sites; the lanes run in
+    parallel threads, each site's lookups going to its own host. Each site
+    keeps its own journal, so an interrupted or failed site resumes on the
+    next run without redoing the others. The price columns of every site
+    that finished are written together at the end, also after Ctrl+C.
+    """
+    site_names = list(SITES) if site_names is None else site_names
+    plugins = {name: load_plugin(name) for name in site_names}
+    lanes = make_lanes(site_names)
+
+    xls = pd.ExcelFile(EXCEL_FILE)
+    frames = workbook.read_sheets(xls, sheet_names)
+    items = workbook.plan_items(frames, sheet_names, ITEM_COL)
+    print(f"🧾 {len(items)} unique items, {len(plugins)} site(s) in {len(lanes)} lane(s)")
+
+    finished = {}
+    stop = threading.Event()
+
+    def run_lane(lane):
+        for name in lane:
+            if stop.is_set():
+                return
+
+            plugin = plugins[name]
+            print(f"\n=== {plugin.SITE} ===")
+            price_map = checkpoint.PriceJournal(plugin.SITE, EXCEL_FILE, frames, sheet_names, ITEM_COL)
+
+            try:
+                with timing.attribute(plugin.SITE, None):
+                    price_site(plugin, items, price_map, stop, SITE_OPTIONS.get(name))
+
+            except Stopped:
+                return
+
+            except Exception as e:
+                # one site down (no debug Chrome, layout change…) doesn't stop the rest
+                print(f"❌ {plugin.SITE} failed, progress kept in {price_map.path}: {e}")
+                continue
+
+            finally:
+                price_map.close()
+
+            finished[plugin.PRICE_COL] = price_map
+
+    executor = ThreadPoolExecutor(max_workers=max(1, min(parallel, len(lanes))))
+
+    try:
+        for future in as_completed([executor.submit(run_lane, lane) for lane in lanes]):
+            future.result()
+
+    except KeyboardInterrupt:
+        # lanes stop at their next price and close their journals;
+        # the sites that already finished are still written below
+        stop.set()
+        print("\n⚠ Interrupted by user. Stopping all sites...")
+        executor.shutdown(wait=True, cancel_futures=True)
+        print("💾 Progress kept in the site journals, re-run to resume")
+
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+    save(finished, sheet_names, write)
+
+
+def save(finished: dict, sheet_names, write=True):
+    """Write the finished sites' price columns in one pass (price col → journal)"""
+    # merge.py picks the journals up later
+    if not write:
+        for price_map in finished.values():
+            price_map.mark_complete()
+        print(f"\n📒 Prices kept in {len(finished)} journal(s) for merge.py")
+        return
+
+    if not finished:
+        print("\nℹ Nothing to write")
+        return
+
+    print(f"\n🔗 Writing {len(finished)} price column(s) into {EXCEL_FILE} ...")
+    workbook.merge_price_maps(
+        EXCEL_FILE, {col: (price_map.with_failed(), sheet_names) for col, price_map in finished.items()}, ITEM_COL
+    )
+    for price_map in finished.values():
+        price_map.finish()
+
+# =========================
+# ENTRYPOINT
+# =========================
+
+def choose_sites() -> list[str]:
+    print("\nSites:")
+    names = list(SITES)
+    for i, name in enumerate(names, start=1):
+        print(f"{i} - {name}")
+
+    choice = input("\nEnter site numbers separated by commas or 0 for ALL: ").strip()
+    if choice == "0":
+        return names
+
+    return [names[int(n) - 1] for n in choice.split(",") if n.strip()]
+
+
+def choose_sheets(xls: pd.ExcelFile) -> list[str]:
+    print("\nFound sheets:")
+    for i, name in enumerate(xls.sheet_names, start=1):
+        print(f"{i} - {name}")
+
+    choice = input("\nEnter sheet number or 0 for ALL: ").strip()
+    if choice == "0":
+        return xls.sheet_names
+
+    return [xls.sheet_names[int(choice) - 1]]
+
+
+def choose_write() -> bool:
+    choice = input("\nWrite the workbook now? (y = now, n = keep journals for merge.py): ").strip().lower()
+    return choice != "n"
+
+
+def main():
+    if not os.path.exists(EXCEL_FILE):
+        print(f"❌ File '{EXCEL_FILE}' not found")
+        return
+
+    sites = choose_sites()
+    sheets = choose_sheets(pd.ExcelFile(EXCEL_FILE))
+    run(sheets, sites, write=choose_write())
+
+    print("\n✅ Done.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+import importlib
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+import async_fetch
+import checkpoint
+import price_cache
+import timing
+import workbook
+
+# =========================
+# CONFIG
+# =========================
+
+# The per-host HTTP limits are split between the workers, not multiplied:
+# sharding doesn't make the sites answer faster. What runs in parallel is
+# the parsing and, above all, the Selenium fallback (one browser per
+# worker), so the pool is as big as the per-host limits allow and no bigger.
+WORKERS = min(os.cpu_count() or 1, async_fetch.PER_HOST, async_fetch.BURST)
+SHARD_SIZE = 250
+
+# site → parser module with prepare(items) and price_items(items, on_price, ...)
+SITES = {
+    "keydrop": "keydrop_parser",
+    "farmskins": "farmskins_parser",
+    "skinclub": "skinclub_parser",
+}
+
+# extra price_items arguments inside a worker — one browser per process
+WORKER_OPTIONS = {
+    "keydrop": {"pool_size": 1},
+}
+
+# =========================
+# WORKER
+# =========================
+
+def _init_worker(workers: int):
+    # ліміти на хост — для всього пулу, а не для кожного процесу
+    async_fetch.PER_HOST = max(1, async_fetch.PER_HOST // workers)
+    async_fetch.RATE = async_fetch.RATE / workers
+    async_fetch.BURST = max(1, async_fetch.BURST // workers)
+
+
+def _price_shard(module_name: str, items: list, options: dict) -> tuple[dict, dict]:
+    """Runs in a worker process with its own HTTP session / browser.
+
+    Returns the prices and the shard's timing samples for the coordinator's report.
+    """
+    site = importlib.import_module(module_name)
+    prices = {}
+    timing.start(site.SITE)
+    try:
+        site.price_items(items, prices.__setitem__, **options)
+    finally:
+        samples = timing.finish(quiet=True)
+    return prices, samples
+
+
+def make_shards(items: list, size: int = SHARD_SIZE) -> list[list]:
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+# =========================
+# COORDINATOR
+# =========================
+
+@timing.traced()
+def process_sheets(site_name: str, sheet_names, workers: int = WORKERS,
+                   shard_size: int = SHARD_SIZE, write=True):
+    """Price a site's sheets over a process pool, with one read and one write.
+
+    The coordinator plans unique items once, cuts them into shards and
+    is the only process that touches the journal and the workbook; each
+    finished shard is journaled right away, so an interrupted run resumes
+    from the last completed shard.
+    """
+    module_name = SITES[site_name]
+    site = importlib.import_module(module_name)
+
+    xls = pd.ExcelFile(site.EXCEL_FILE)
+    frames = workbook.read_sheets(xls, sheet_names)
+    items = workbook.plan_items(frames, sheet_names, site.ITEM_COL)
+
+    price_map = checkpoint.PriceJournal(site.SITE, site.EXCEL_FILE, frames, sheet_names, site.ITEM_COL)
+    items = price_map.pending(items)
+    # slug index etc. is built here once, workers only read it
+    site.prepare(items)
+
+    shards = make_shards(items, shard_size)
+    # each worker gets an equal share of the per-host limits, at least one
+    # slot / token, so more workers than that would overshoot the host's limit
+    # (see WORKERS)
+    workers = max(1, min(workers, len(shards), async_fetch.PER_HOST, async_fetch.BURST))
+    print(f"🧩 {len(items)} items in {len(shards)} shards over {workers} processes")
+
+    executor = ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(workers,),
+    )
+    options = WORKER_OPTIONS.get(site_name, {})
+    done = failed = 0
+
+    try:
+        futures = {
+            executor.submit(_price_shard, module_name, shard, options): n
+            for n, shard in enumerate(shards, start=1)
+        }
+        for future in as_completed(futures):
+            n = futures[future]
+            try:
+                prices, samples = future.result()
+            except Exception as e:
+                print(f"❌ Shard {n} failed, its items stay pending: {e}")
+                failed += 1
+                continue
+
+            timing.absorb(samples)
+            for item, price in prices.items():
+                if price is None:
+                    price_map.fail(item)
+                else:
+                    price_map[item] = price
+
+            done += 1
+            found = sum(price not in (None, price_cache.NOT_FOUND) for price in prices.values())
+            print(f"📦 [{done}/{len(shards)}] shard {n}: {found}/{len(prices)} priced")
+
+    except KeyboardInterrupt:
+        print("\n⚠ Interrupted by user. Processing stopped.")
+        print(f"💾 Progress kept in {price_map.path}, re-run to resume")
+        return
+
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+        price_map.close()
+
+    if failed:
+        print(f"💾 {failed} shard(s) failed, progress kept in {price_map.path}, re-run to resume")
+        return
+
+    # merge.py writes every site in one pass
+    if not write:
+        price_map.mark_complete()
+        print(f"📒 Prices kept in {price_map.path} for merge.py")
+        return
+
+    filled = workbook.write_prices(site.EXCEL_FILE, sheet_names, site.PRICE_COL, price_map.with_failed(), site.ITEM_COL)
+    price_map.finish()
+    print(f"💾 Saved {len(filled)} sheet(s)")
+
+# =========================
+# ENTRYPOINT
+# =========================
+
+def main():
+    print("\nSites:")
+    names = list(SITES)
+    for i, name in enumerate(names, start=1):
+        print(f"{i} - {name}")
+
+    site_name = names[int(input("\nEnter site number: ").strip()) - 1]
+    site = importlib.import_module(SITES[site_name])
+
+    if not os.path.exists(site.EXCEL_FILE):
+        print(f"❌ File '{site.EXCEL_FILE}' not found")
+        return
+
+    sheets = site.choose_sheets(pd.ExcelFile(site.EXCEL_FILE))
+    process_sheets(site_name, sheets)
+
+    print("\n✅ Done.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,33 @@
 import re
 import os
 import time
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, WebDriverException
-from webdriver_manager.chrome import ChromeDriverManager
 import pandas as pd
 
+import async_fetch
+import checkpoint
+import driver_factory
+import html_parse
+import http_fetch
+import price_cache
+import slugs
+import timing
+import workbook
+
 # =========================
 # CONFIG
 # =========================
 
 EXCEL_FILE = "Problematic Withdrawals.xlsx"
 ITEM_COL = "steam_market_hash_name"
+SITE = "skinclub"
 PRICE_COL = "skinclub_price"
+FETCH_ENGINE = "async"  # "async" or "selenium"
+BASE_URL = "https://wiki.skin.club/en/items/"
 
 # =========================
 # URL FORMAT (UNCHANGED)
@@ -65,19 +75,117 @@ def format_skinclub_url(skin_name):
 
     return url
 
+# =========================
+# SLUG INDEX
+# =========================
+
+def format_skinclub_slug(skin_name):
+    return format_skinclub_url(skin_name).removeprefix(BASE_URL)
+
+
+def format_skinclub_slugs(names: pd.Series) -> pd.Series:
+    """Vectorized format_skinclub_slug for weapon names; NaN for stickers / odd names"""
+    clean = (
+        names.str.replace("★", "", regex=False)
+        .str.replace("StatTrak™", "", regex=False)
+        .str.strip()
+    )
+    parts = clean.str.split(" | ", regex=False)
+    weapon = parts.str[0].str.strip().str.lower().str.replace(" ", "-", regex=False)
+    name = parts.str[1].str.split(" (", regex=False).str[0].str.strip().str.lower().str.replace(" ", "-", regex=False)
+
+    quality = (
+        names.str.extract(r"\(([^)]+)\)", expand=False)
+        .str.strip().str.lower().str.replace(" ", "-", regex=False)
+        .fillna("factory-new")
+    )
+
+    slug = weapon + "-" + name + "-" + quality
+    slug = slug.where(~names.str.contains("StatTrak", regex=False), "stattrak-" + slug)
+    return slug.where(~clean.str.startswith("Sticker"))
+
+
+def skinclub_url(skin_name):
+    slug = slugs.slug_for(SITE, skin_name, format_skinclub_slug)
+    if slug is None:
+        return None
+    return f"{BASE_URL}{slug}"
+
+
+@timing.timed(timing.PRICE_PARSE)
+def to_price(text):
+    return float(text.replace("$", "").replace(",", "").strip())
+
 # =========================
 # SCRAPER (MINIMAL CHANGES)
 # =========================
 
+def parse_skinclub_html(html, skin_name):
+    """Same selectors as the Selenium path, on static HTML"""
+    soup = html_parse.parse_html(html)
+
+    if skin_name.strip().startswith("Sticker"):
+        price_element = soup.select_one("div.flex.items-center span.block.text-brand-300")
+        txt = price_element.get_text(strip=True) if price_element else ""
+        if not re.search(r"\$\s*\d", txt):
+            raise http_fetch.NeedsBrowser(skin_name)
+
+        return to_price(txt)
+
+    rows = soup.select("a.flex.items-center.justify-between")
+    if not rows:
+        raise http_fetch.NeedsBrowser(skin_name)
+
+    quality_from_name = ""
+    if "(" in skin_name and ")" in skin_name:
+        quality_from_name = skin_name.split("(")[-1].replace(")", "").strip().lower()
+
+    price_selector = (
+        "span.text-rarity-stattrak" if "stattrak" in skin_name.lower()
+        else "span.text-primary-green-900"
+    )
+
+    for row in rows:
+        quality_el = row.select_one("span.truncate.flex-1")
+        price_span = row.select_one(price_selector)
+        if not quality_el or not price_span:
+            continue
+
+        if quality_el.get_text(strip=True).lower() == quality_from_name:
+            try:
+                return to_price(price_span.get_text(strip=True))
+            except ValueError:
+                continue
+
+    return None
+
+
+def price_from_response(skin_name, status, final_url, html):
+    html = http_fetch.check_response(status, html, final_url)
+    if html is None:
+        return price_cache.NOT_FOUND
+
+    # no such item: skinclub redirects to the catalog
+    if "/items/" not in final_url:
+        return price_cache.NOT_FOUND
+
+    price = parse_skinclub_html(html, skin_name)
+    return price_cache.NOT_FOUND if price is None else price
+
+
+@price_cache.cached(SITE, precheck=price_cache.not_a_skin)
 def get_skinclub_price(driver, skin_name):
-    url = format_skinclub_url(skin_name)
+    url = skinclub_url(skin_name)
+    if url is None:
+        return price_cache.NOT_FOUND
 
     try:
         driver.set_page_load_timeout(30)
-        driver.get(url)
+        with timing.stage(timing.NAVIGATE):
+            driver.get(url)
 
         if "/items/" not in driver.current_url:
-            return None
+            return price_cache.NOT_FOUND
 
     except TimeoutException:
         print(f"⚠ Timeout loading page for {skin_name} (skipped after 30s)")
@@ -89,25 +197,27 @@ def get_skinclub_price(driver, skin_name):
     try:
         # 🟢 Якщо це стікер — шукаємо інший елемент
         if skin_name.strip().startswith("Sticker"):
-            price_element = WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located(
-                    (By.CSS_SELECTOR, "div.flex.items-center span.block.text-brand-300")
+            with timing.stage(timing.WAIT):
+                price_element = WebDriverWait(driver, 10).until(
+                    EC.presence_of_element_located(
+                        (By.CSS_SELECTOR, "div.flex.items-center span.block.text-brand-300")
+                    )
                 )
-            )
 
-            for _ in range(10):
-                txt = price_element.text.strip()
-                if re.search(r"\$\s*\d", txt):
-                    break
-                time.sleep(0.3)
+                for _ in range(10):
+                    txt = price_element.text.strip()
+                    if re.search(r"\$\s*\d", txt):
+                        break
+                    time.sleep(0.3)
 
-            return float(txt.replace("$", "").replace(",", "").strip())
+            return to_price(txt)
 
-        rows = WebDriverWait(driver, 10).until(
-            EC.presence_of_all_elements_located(
-                (By.CSS_SELECTOR, "a.flex.items-center.justify-between")
+        with timing.stage(timing.WAIT):
+            rows = WebDriverWait(driver, 10).until(
+                EC.presence_of_all_elements_located(
+                    (By.CSS_SELECTOR, "a.flex.items-center.justify-between")
+                )
             )
-        )
 
         quality_from_name = ""
         if "(" in skin_name and ")" in skin_name:
@@ -129,7 +239,7 @@ def get_skinclub_price(driver, skin_name):
                     )
 
                 if quality_text == quality_from_name:
-                    return float(price_span.text.replace("$", "").replace(",", ""))
+                    return to_price(price_span.text)
 
             except Exception:
                 continue
@@ -137,7 +247,8 @@ def get_skinclub_price(driver, skin_name):
     except WebDriverException:
         return None
 
-    return None
+    # the quality rows loaded, none of them is this one
+    return price_cache.NOT_FOUND
 
 # =========================
 # EXCEL WORKFLOW (AS IN VARIANT 2)
@@ -154,61 +265,86 @@ def choose_sheets(xls: pd.ExcelFile) -> list[str]:
 
     return [xls.sheet_names[int(choice) - 1]]
 
-def process_sheets(sheet_names: list[str]):
+def make_driver():
     options = Options()
     # options.add_argument("--headless=new")
     options.add_argument("--disable-blink-features=AutomationControlled")
 
-    driver = webdriver.Chrome(
-        service=Service(ChromeDriverManager().install()),
-        options=options
-    )
+    return driver_factory.chrome(options)
 
-    xls = pd.ExcelFile(EXCEL_FILE)
-    writer = pd.ExcelWriter(
-        EXCEL_FILE,
-        engine="openpyxl",
-        mode="a",
-        if_sheet_exists="replace"
-    )
-    try:
-        total = len(sheet_names)
-        idx = 0
 
-        for sheet in xls.sheet_names:
-            df = pd.read_excel(xls, sheet_name=sheet)
+def prepare(items):
+    """Once per run, before any lookups (also before worker processes start)"""
+    slugs.build_index(SITE, items, format_skinclub_slug, format_skinclub_slugs)
 
-            if sheet in sheet_names and ITEM_COL in df.columns:
-                idx += 1
-                print(f"\n=== Processing sheet {idx}/{total}: {sheet} ===")
 
-                prices = []
-                items = df[ITEM_COL].astype(str).tolist()
+def price_items(items, on_price, engine=FETCH_ENGINE):
+    """Every lookup pass over items; on_price(item, price or None) per item"""
+    driver = None
 
-                for i, item in enumerate(items, start=1):
-                    price = get_skinclub_price(driver, item)
-                    
-                    if price is not None:
-                        print(f"[{i}/{len(items)}] {item} → {price}")
-                        prices.append(price)
-                    else:
-                        print(f"[{i}/{len(items)}] ⚠ No price found for {item}")
-                        prices.append("-")
+    def warm():
+        # the first page that needs the browser: Chrome starts while the rest is fetched
+        driver_factory.prewarm(make_driver)
 
-                df[PRICE_COL] = prices
+    try:
+        browser_items = items
+        if engine == "async":
+            browser_items = async_fetch.run_lookups(
+                items, skinclub_url, price_from_response, on_price, site=SITE, on_needs_browser=warm
+            )
+
+        if browser_items:
+            print(f"\n🌐 {len(browser_items)} items need the browser")
+            driver = driver_factory.take(make_driver)
+            for item in browser_items:
+                on_price(item, get_skinclub_price(driver, item))
+
+    finally:
+        driver_factory.discard(make_driver)
+        if driver:
+            driver.quit()
 
-            df.to_excel(writer, sheet_name=sheet, index=False)
+
+@timing.traced(SITE)
+def process_sheets(sheet_names: list[str], engine=FETCH_ENGINE, write=True):
+    xls = pd.ExcelFile(EXCEL_FILE)
+    frames = workbook.read_sheets(xls, sheet_names)
+    items = workbook.plan_items(frames, sheet_names, ITEM_COL)
+
+    price_map = checkpoint.PriceJournal(SITE, EXCEL_FILE, frames, sheet_names, ITEM_COL)
+    items = price_map.pending(items)
+    prepare(items)
+    done = 0
+
+    def report(item, price):
+        nonlocal done
+        done += 1
+        if price is not None:
+            print(f"[{done}/{len(items)}] {item} → {price}")
+            price_map[item] = price
+        else:
+            print(f"[{done}/{len(items)}] ⚠ Lookup failed for {item}")
+            price_map.fail(item)
+
+    try:
+        price_items(items, report, engine)
 
     except KeyboardInterrupt:
         print("\n⚠ Interrupted by user. Processing stopped.")
-        driver.quit()
-        writer.close()
+        print(f"💾 Progress kept in {price_map.path}, re-run to resume")
         return
 
     finally:
-        driver.quit()
+        price_map.close()
+
+    # merge.py writes every site in one pass
+    if not write:
+        price_map.mark_complete()
+        print(f"📒 Prices kept in {price_map.path} for merge.py")
+        return
 
-    writer.close()
+    workbook.write_prices(EXCEL_FILE, sheet_names, PRICE_COL, price_map.with_failed(), ITEM_COL)
+    price_map.finish()
 
 # =========================
 # ENTRYPOINT
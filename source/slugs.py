@@ -0,0 +1,123 @@
+import hashlib
+import inspect
+import json
+import os
+import threading
+
+import pandas as pd
+
+import timing
+
+# =========================
+# CONFIG
+# =========================
+
+SLUG_DIR = "slug_index"
+
+_indexes = {}
+_fingerprints = {}  # site → fingerprint of the builders the index was made with
+_lock = threading.Lock()
+
+# =========================
+# PERSISTENCE
+# =========================
+
+def index_path(site: str) -> str:
+    return os.path.join(SLUG_DIR, f"{site}.json")
+
+
+def fingerprint(*builders) -> str:
+    """Hash of the slug builders' source: a changed format_* rule gives a new one"""
+    digest = hashlib.sha1()
+    for fn in builders:
+        if fn is None:
+            continue
+        try:
+            source = inspect.getsource(fn)
+        except (OSError, TypeError):
+            source = f"{fn.__module__}.{fn.__qualname__}"
+        digest.update(source.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def load_index(site: str, expected: str | None = None) -> dict:
+    """The site's saved index; with expected, one made by other builders is dropped"""
+    with _lock:
+        if site not in _indexes:
+            path = index_path(site)
+            data = {}
+            if os.path.exists(path):
+                with open(path, encoding="utf-8") as f:
+                    data = json.load(f)
+            # an index without a fingerprint predates it and is treated as stale
+            _fingerprints[site] = data.get("fingerprint")
+            _indexes[site] = data.get("slugs", {}) if _fingerprints[site] else {}
+
+        if expected is not None and _fingerprints[site] != expected:
+            if _indexes[site]:
+                print(f"♻ {site}: slug rules changed, rebuilding the slug index")
+            _indexes[site] = {}
+            _fingerprints[site] = expected
+        return _indexes[site]
+
+
+def save_index(site: str):
+    os.makedirs(SLUG_DIR, exist_ok=True)
+    with _lock:
+        data = {"fingerprint": _fingerprints.get(site), "slugs": dict(_indexes.get(site, {}))}
+    with open(index_path(site), "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=0)
+
+# =========================
+# BUILD / LOOKUP
+# =========================
+
+def _format_safe(format_one, name):
+    try:
+        return format_one(name)
+    except Exception:
+        return None
+
+
+def build_index(site: str, names, format_one, format_many=None) -> dict:
+    """name → slug for a whole column, persisted per site.
+
+    format_many(Series) is the site's vectorized builder for regular
+    weapon names; it returns NaN where it can't decide (stickers, odd
+    names), and those rows go through the per-item format_one.
+    Names already in the saved index are not rebuilt, unless the index
+    was built by a different version of format_one / format_many.
+    """
+    index = load_index(site, fingerprint(format_one, format_many))
+    missing = pd.Series(pd.unique(pd.Series(list(names), dtype=object)), dtype=object)
+    missing = missing[~missing.isin(index.keys())]
+
+    if missing.empty:
+        return index
+
+    built = pd.Series(index=missing.index, dtype=object)
+    if format_many is not None:
+        built = format_many(missing)
+
+    todo = built.isna()
+    built[todo] = [_format_safe(format_one, name) for name in missing[todo]]
+
+    with _lock:
+        index.update(zip(missing.tolist(), built.tolist()))
+    save_index(site)
+
+    print(f"🔗 {site}: {len(missing)} new slugs ({int((~todo).sum())} vectorized), {len(index)} total")
+    return index
+
+
+@timing.timed(timing.URL_BUILD)
+def slug_for(site: str, name: str, format_one):
+    """Dictionary lookup, falling back to format_one for names not indexed yet"""
+    index = load_index(site)
+    if name in index:
+        return index[name]
+
+    slug = _format_safe(format_one, name)
+    with _lock:
+        index[name] = slug
+    return slug
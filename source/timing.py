@@ -0,0 +1,228 @@
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# =========================
+# CONFIG
+# =========================
+
+TRACE_DIR = "traces"
+
+# stage names used across the parsers
+URL_BUILD = "url_build"
+FETCH = "fetch"              # HTTP request (requests / aiohttp)
+NAVIGATE = "navigate"        # driver.get / clicks that load a page
+WAIT = "wait"                # WebDriverWait / readiness / sleeps
+EXTRACT = "extract"          # page_source / outerHTML out of the browser
+SOUP_PARSE = "soup_parse"
+PRICE_PARSE = "price_parse"
+EXCEL_WRITE = "excel_write"
+LOOKUP = "lookup"            # one item end to end, the stages above included
+
+# reported without a share of the lookup time: LOOKUP is that time, and
+# the workbook write runs after the lookups, not as part of them
+UNSHARED = {LOOKUP, EXCEL_WRITE}
+
+# =========================
+# RUN STATE
+# =========================
+
+_site = contextvars.ContextVar("timing_site", default=None)
+_item = contextvars.ContextVar("timing_item", default=None)
+
+_lock = threading.Lock()
+_run = None
+
+
+class _Run:
+    def __init__(self, site: str):
+        os.makedirs(TRACE_DIR, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        self.site = site
+        self.path = os.path.join(TRACE_DIR, f"{site}-{stamp}-{os.getpid()}.jsonl")
+        self.file = open(self.path, "a", encoding="utf-8")
+        self.samples = {}  # (site, stage) → [seconds]
+        self.started = time.perf_counter()
+        self.closed = False
+
+
+def start(site: str) -> str | None:
+    """Begin tracing this process's run; returns the trace path.
+
+    Until start() is called every stage() is a no-op, so imports from
+    the benchmark or merge.py cost nothing.
+    """
+    global _run
+    with _lock:
+        if _run is None:
+            _run = _Run(site)
+        return _run.path
+
+
+def record(stage: str, seconds: float, site: str | None = None, item: str | None = None):
+    current = _run
+    if current is None:
+        return
+
+    site = site or _site.get() or current.site
+    item = item if item is not None else _item.get()
+    line = json.dumps(
+        {"t": round(time.time(), 3), "site": site, "stage": stage, "item": item, "ms": round(seconds * 1000, 3)},
+        ensure_ascii=False,
+    )
+    with _lock:
+        # a stage still running in another thread when finish() closed the file
+        if current.closed:
+            return
+        current.file.write(line + "\n")
+        current.samples.setdefault((site, stage), []).append(seconds)
+
+# =========================
+# MEASURING
+# =========================
+
+@contextmanager
+def stage(name: str, item: str | None = None):
+    if _run is None:
+        yield
+        return
+
+    start_time = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - start_time, item=item)
+
+
+@contextmanager
+def attribute(site: str | None, name: str):
+    """Attribute every stage inside to (site, name)"""
+    site_token, item_token = _site.set(site), _item.set(name)
+    try:
+        yield
+    finally:
+        _site.reset(site_token)
+        _item.reset(item_token)
+
+
+@contextmanager
+def item(site: str | None, name: str):
+    """attribute() plus a "lookup" sample for the whole block"""
+    with attribute(site, name), stage(LOOKUP):
+        yield
+
+
+def timed(name: str):
+    """Decorator form of stage()"""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+# =========================
+# RUNS
+# =========================
+
+@contextmanager
+def run(site: str):
+    """start()/finish() around a block, unless an outer run is already going"""
+    owner = _run is None
+    if owner:
+        start(site)
+    try:
+        yield
+    finally:
+        if owner:
+            finish()
+
+
+def traced(site: str | None = None):
+    """Decorator form of run(); site=None takes the site from the first argument"""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with run(site or args[0]):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def absorb(samples: dict):
+    """Add a worker process's samples (from its finish()) to this run's summary"""
+    current = _run
+    if current is None:
+        return
+    with _lock:
+        for key, values in samples.items():
+            current.samples.setdefault(tuple(key), []).extend(values)
+
+# =========================
+# REPORT
+# =========================
+
+def _percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, round(q * (len(ordered) - 1)))]
+
+
+def summary(samples: dict) -> list[dict]:
+    """Per site and stage: count, total, share of the site's lookup time, p50/p95.
+
+    The share is only given for stages inside the lookups (not UNSHARED).
+    """
+    lookup_total = {
+        site: sum(values) for (site, stage_name), values in samples.items() if stage_name == LOOKUP
+    }
+    rows = []
+
+    for (site, stage_name), values in sorted(samples.items()):
+        total = sum(values)
+        base = lookup_total.get(site)
+        rows.append({
+            "site": site,
+            "stage": stage_name,
+            "count": len(values),
+            "total_s": round(total, 3),
+            "share": round(total / base, 3) if base and stage_name not in UNSHARED else None,
+            "p50_ms": round(_percentile(values, 0.50) * 1000, 1),
+            "p95_ms": round(_percentile(values, 0.95) * 1000, 1),
+        })
+
+    return rows
+
+
+def finish(quiet: bool = False) -> dict:
+    """Close the trace, append the summary to it and print it.
+
+    Returns the raw samples, so a worker process can hand them to absorb().
+    """
+    global _run
+    with _lock:
+        current, _run = _run, None
+        if current is None:
+            return {}
+
+        current.closed = True
+        rows = summary(current.samples)
+        wall = round(time.perf_counter() - current.started, 3)
+        current.file.write(json.dumps({"summary": rows, "wall_s": wall}) + "\n")
+        current.file.close()
+
+    if not quiet:
+        print(f"\n⏱ Timing ({current.path}), {wall} s wall")
+        print(f"   {'site':<10} {'stage':<12} {'count':>6} {'total s':>9} {'share':>6} {'p50 ms':>9} {'p95 ms':>9}")
+        for row in rows:
+            share = f"{row['share']:.0%}" if row["share"] is not None else ""
+            print(
+                f"   {row['site']:<10} {row['stage']:<12} {row['count']:>6} {row['total_s']:>9} "
+                f"{share:>6} {row['p50_ms']:>9} {row['p95_ms']:>9}"
+            )
+
+    return current.samples
@@ -0,0 +1,134 @@
+import pandas as pd
+from openpyxl import load_workbook
+
+import timing
+
+# =========================
+# CONFIG
+# =========================
+
+ITEM_COL = "steam_market_hash_name"
+MISSING = "-"
+
+# =========================
+# PLANNING
+# =========================
+
+def read_sheets(xls: pd.ExcelFile, sheet_names=None) -> dict[str, pd.DataFrame]:
+    """Only the selected sheets are parsed; None means all of them"""
+    sheet_names = xls.sheet_names if sheet_names is None else sheet_names
+    return {sheet: pd.read_excel(xls, sheet_name=sheet) for sheet in sheet_names}
+
+
+def plan_items(frames: dict[str, pd.DataFrame], sheet_names, item_col=ITEM_COL) -> list[str]:
+    """Unique hash names over every selected sheet, in first-seen order"""
+    seen = {}
+    rows = 0
+
+    for sheet in sheet_names:
+        df = frames.get(sheet)
+        if df is None or item_col not in df.columns:
+            continue
+        items = df[item_col].astype(str).tolist()
+        rows += len(items)
+        seen.update(dict.fromkeys(items))
+
+    unique = list(seen)
+    print(f"\n🧮 {len(unique)} unique items in {rows} rows ({rows - len(unique)} repeats skipped)")
+    return unique
+
+# =========================
+# WRITING
+# =========================
+
+# Prices go straight into the worksheet cells with openpyxl: only the
+# price column of the affected sheets changes, every other sheet, column
+# and format stays exactly as it is in the file.
+
+def _header(ws) -> dict:
+    return {cell.value: cell.column for cell in ws[1] if cell.value is not None}
+
+
+def _column(ws, header: dict, name: str) -> int:
+    """Column index of `name`, appended after the last column if missing"""
+    if name not in header:
+        col = max(header.values(), default=0) + 1
+        ws.cell(row=1, column=col, value=name)
+        header[name] = col
+    return header[name]
+
+
+def _items(ws, col: int) -> list[tuple[int, str]]:
+    """(row number, item) for every non-empty cell below the header"""
+    return [
+        (cell.row, str(cell.value))
+        for (cell,) in ws.iter_rows(min_row=2, min_col=col, max_col=col)
+        if cell.value is not None
+    ]
+
+
+@timing.timed(timing.EXCEL_WRITE)
+def write_prices(path: str, sheet_names, price_col, price_map, item_col=ITEM_COL) -> list[str]:
+    """Write price_col of every selected sheet in place.
+
+    Only sheets whose items are all priced are touched, so an interrupted
+    run never half-fills a sheet. Returns the names of the filled sheets.
+    """
+    wb = load_workbook(path)
+    filled = []
+
+    for sheet in sheet_names:
+        if sheet not in wb.sheetnames:
+            continue
+        ws = wb[sheet]
+        header = _header(ws)
+        if item_col not in header:
+            continue
+
+        rows = _items(ws, header[item_col])
+        if not all(item in price_map for _, item in rows):
+            continue
+
+        col = _column(ws, header, price_col)
+        for row, item in rows:
+            ws.cell(row=row, column=col, value=price_map[item])
+        filled.append(sheet)
+
+    if filled:
+        wb.save(path)
+    return filled
+
+# =========================
+# MERGE
+# =========================
+
+@timing.timed(timing.EXCEL_WRITE)
+def merge_price_maps(path: str, columns: dict, item_col=ITEM_COL):
+    """Write several sites' price columns with one load and one save.
+
+    columns maps price_col → (price_map, sheets); sheets=None means every
+    sheet that has item_col. Items missing from a price map get "-".
+    """
+    wb = load_workbook(path)
+
+    for ws in wb.worksheets:
+        header = _header(ws)
+        if item_col not in header:
+            print(f"   ⚠️ Skipped {ws.title} (no {item_col})")
+            continue
+
+        rows = _items(ws, header[item_col])
+        written = []
+
+        for price_col, (price_map, sheets) in columns.items():
+            if sheets is not None and ws.title not in sheets:
+                continue
+            col = _column(ws, header, price_col)
+            for row, item in rows:
+                price = price_map.get(item)
+                ws.cell(row=row, column=col, value=MISSING if pd.isna(price) else price)
+            written.append(price_col)
+
+        print(f"   🔄 {ws.title}: {', '.join(written)}")
+
+    wb.save(path)